@@ -1,15 +1,31 @@
-from flask import Flask, render_template, request, jsonify
-from werkzeug.utils import secure_filename
-import os
+from flask import Flask, Request, Response, current_app, render_template, request, jsonify
+from tempfile import SpooledTemporaryFile
 import zipfile
-import json
+
+from greedles.model.character import Character
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.parser.archive import iter_save_files
+from greedles.parser.decode_worker import encode_payload
+from greedles.parser.parser import InputHandler, Parsers
+from greedles.price_guide.price_guide import PRICE_GUIDE_DIRECTORY, PRICE_GUIDE_SNAPSHOT, PriceGuideFixed
+
+
+class UploadRequest(Request):
+    """Keeps uploaded files in memory until they outgrow UPLOAD_SPILL_THRESHOLD"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledTemporaryFile(max_size=current_app.config['UPLOAD_SPILL_THRESHOLD'])
+
 
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = 'uploads'
+app.request_class = UploadRequest
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Uploads larger than this are spilled to a temporary file
+app.config['UPLOAD_SPILL_THRESHOLD'] = 4 * 1024 * 1024
 
-# Ensure upload folder exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Built once, every request shares the read-only config and the parsers
+parsers = Parsers(Config(ItemCodesEN()), PriceGuideFixed(PRICE_GUIDE_DIRECTORY, PRICE_GUIDE_SNAPSHOT))
 
 @app.route('/')
 def index():
@@ -19,47 +35,40 @@ def index():
 def upload_file():
     if 'file' not in request.files:
         return jsonify({'error': 'No file part'}), 400
-    
+
     file = request.files['file']
     if file.filename == '':
         return jsonify({'error': 'No selected file'}), 400
-    
+
     if file and file.filename.endswith('.zip'):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
         try:
-            with zipfile.ZipFile(filepath, 'r') as zip_ref:
+            # The archive is read straight from the upload buffer
+            with zipfile.ZipFile(file.stream) as zip_ref:
                 has_psobank = '.psobank' in zip_ref.namelist()
-                pso_char_files = [f for f in zip_ref.namelist() if f.endswith('.psochar')]
-                
-                if not has_psobank:
-                    return jsonify({'error': 'The zip file must contain exactly one .psobank file at the root.'}), 400
-                
-                # Process the files here
-                parsed_data = {
-                    'psobank': parse_psobank_file(zip_ref.read('.psobank')),
-                    'psoChars': [parse_pso_char_file(zip_ref.read(f)) for f in pso_char_files]
-                }
-                
-                return jsonify(parsed_data)
-                
+
+            if not has_psobank:
+                return jsonify({'error': 'The zip file must contain exactly one .psobank file at the root.'}), 400
+
+            file.stream.seek(0)
+            handler = InputHandler(parsers.config, parsers=parsers)
+            psobank = None
+            pso_chars = []
+            for model in handler.decode_stream(iter_save_files(file.stream, InputHandler.input_file_sort_key)):
+                if isinstance(model, Character):
+                    pso_chars.append(model)
+                elif model.mode == Config.Mode.NORMAL:
+                    psobank = model
+
+            parsed_data = {
+                'psobank': psobank,
+                'psoChars': pso_chars,
+            }
+            return Response(encode_payload(parsed_data), mimetype='application/json')
+
         except Exception as e:
             return jsonify({'error': f'Error processing zip file: {str(e)}'}), 400
-        finally:
-            # Clean up the uploaded file
-            os.remove(filepath)
-            
-    return jsonify({'error': 'Please upload a valid .zip file.'}), 400
-
-def parse_psobank_file(content):
-    # Replace with actual parsing logic
-    return {'type': 'psobank', 'content': content.decode('utf-8', errors='ignore')}
 
-def parse_pso_char_file(content):
-    # Replace with actual parsing logic
-    return {'type': 'psochar', 'content': content.decode('utf-8', errors='ignore')}
+    return jsonify({'error': 'Please upload a valid .zip file.'}), 400
 
 if __name__ == '__main__':
-    app.run(debug=True) 
\ No newline at end of file
+    app.run(debug=True)
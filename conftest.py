@@ -1,4 +1,9 @@
 import logging
+from pathlib import Path
+
+import pytest
+
+from greedles.price_guide.price_guide import PRICE_GUIDE_DIRECTORY
 
 def pytest_configure(config):
     """Configure logging format and level for test runs"""
@@ -9,3 +14,12 @@ def pytest_configure(config):
     )
     logging.info("Pytest logging configured")  # Example log message
 
+
+@pytest.fixture
+def price_directory(tmp_path: Path) -> Path:
+    """A copy of the shipped price files in tmp_path / "prices", free to edit"""
+    directory = tmp_path / "prices"
+    directory.mkdir()
+    for path in PRICE_GUIDE_DIRECTORY.glob("*.json"):
+        (directory / path.name).write_bytes(path.read_bytes())
+    return directory
@@ -1,40 +1,205 @@
-from fastapi import FastAPI, UploadFile, File
-from fastapi.responses import JSONResponse
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 import asyncio
-from greedles.parser.parser import InputHandler
-from greedles.model.config.config import Config
+from pathlib import Path
+import logging
+import multiprocessing
+import os
+import tempfile
+from fastapi import FastAPI, Request, UploadFile, File
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from typing import List, Optional
+from greedles.parser.decode_worker import (
+    AccountResult,
+    Upload,
+    decode_in_worker,
+    decode_uploads,
+    encode_batch,
+    init_worker,
+    iter_records,
+    upload_key,
+    worker_price_guide_version,
+)
 from greedles.parser.parser import Parsers
+from greedles.parser.result_cache import ResultCache
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.price_guide.price_guide import (
+    PRICE_GUIDE_DIRECTORY,
+    PRICE_GUIDE_SNAPSHOT,
+)
+from greedles.price_guide.reloader import PriceGuideReloader
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the price guide directory for updated prices
+PRICE_GUIDE_POLL_INTERVAL = 30.0
+
+# Processes decoding uploads; 0 decodes on a thread of the server process
+PARSE_WORKERS = int(os.environ.get("GREEDLES_PARSE_WORKERS", os.cpu_count() or 1))
+
+# Disk tier of the result cache, shared by the server and its workers. The
+# directory must only be accessible to this user; unless one is configured,
+# a pool shares a private temporary directory removed on shutdown
+RESULT_CACHE_DIRECTORY = (
+    Path(os.environ["GREEDLES_RESULT_CACHE"])
+    if os.environ.get("GREEDLES_RESULT_CACHE")
+    else None
+)
+
+
+async def start_parse_pool(
+    workers: int, result_cache_directory: Optional[Path] = None
+) -> ProcessPoolExecutor:
+    """
+    Start the decoding processes and wait until each has its parsers
+
+    Workers are spawned rather than forked, the reloader thread must not be
+    copied into them.
+    """
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(PRICE_GUIDE_DIRECTORY, PRICE_GUIDE_SNAPSHOT, result_cache_directory),
+    )
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, worker_price_guide_version)
+            for _ in range(workers)
+        )
+    )
+    return pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build everything requests share once, before the first request
+
+    app.state.config is the read-only item code configuration and
+    app.state.parsers the parsers bound to the current price guide; they are
+    rebuilt whenever the reloader swaps in new prices. app.state.parse_pool
+    holds the decoding processes, None when PARSE_WORKERS is 0, and
+    app.state.result_cache the results of earlier uploads.
+    """
+    # Built on a worker thread, PriceGuideFixed runs its own loop to load
+    reloader = await asyncio.to_thread(
+        PriceGuideReloader,
+        PRICE_GUIDE_DIRECTORY,
+        PRICE_GUIDE_SNAPSHOT,
+        PRICE_GUIDE_POLL_INTERVAL,
+    )
+    config = Config(ItemCodesEN())
+
+    def use_price_guide(price_guide):
+        app.state.parsers = Parsers(config, price_guide)
+
+    use_price_guide(reloader.current)
+    reloader.listeners.append(use_price_guide)
+    app.state.config = config
+    app.state.price_guide_reloader = reloader
+    # Workers each decode part of the uploads, files one of them decoded are
+    # only found by the others through the disk tier
+    result_cache_directory = RESULT_CACHE_DIRECTORY
+    temporary_directory = None
+    if result_cache_directory is None and PARSE_WORKERS > 0:
+        # Created with a unique name and mode 0700
+        temporary_directory = tempfile.TemporaryDirectory(prefix="greedles-results-")
+        result_cache_directory = Path(temporary_directory.name)
+    app.state.result_cache = ResultCache(result_cache_directory)
+    # Started after the reloader wrote the snapshot the workers load
+    app.state.parse_pool = (
+        await start_parse_pool(PARSE_WORKERS, result_cache_directory)
+        if PARSE_WORKERS > 0
+        else None
+    )
+
+    reloader.start()
+    yield
+    reloader.stop()
+    if app.state.parse_pool is not None:
+        app.state.parse_pool.shutdown(cancel_futures=True)
+    if temporary_directory is not None:
+        temporary_directory.cleanup()
 
-app = FastAPI(title="Greedles PSO Parser API")
+
+app = FastAPI(title="Greedles PSO Parser API", lifespan=lifespan)
+
+
+async def decode(
+    app: FastAPI, parsers: Parsers, uploads: List[Upload], compact: bool = False
+) -> bytes:
+    """
+    Serialized parse result of the uploaded files, see encode_payload
+
+    Decoding never runs on the event loop, other requests are served while
+    it is in progress.
+    """
+    # A repeated upload is answered from the cache, files of a changed
+    # upload are still looked up one by one while decoding
+    result_cache: ResultCache = app.state.result_cache
+    key = await asyncio.to_thread(upload_key, parsers, uploads, compact)
+    payload = await asyncio.to_thread(result_cache.get, key)
+    if payload is not None:
+        return payload
+
+    pool: ProcessPoolExecutor = app.state.parse_pool
+    if pool is None:
+        payload = await asyncio.to_thread(
+            decode_uploads, parsers, uploads, result_cache, compact
+        )
+    else:
+        version, payload = await asyncio.get_running_loop().run_in_executor(
+            pool, decode_in_worker, uploads, parsers.price_guide.version, compact
+        )
+        # The worker could not load the same prices, the result is not
+        # cached under the key of this guide
+        if version != parsers.price_guide.version:
+            logger.info(
+                f"Not caching a result priced with {version} instead of "
+                f"{parsers.price_guide.version}"
+            )
+            return payload
+    await asyncio.to_thread(result_cache.put, key, payload)
+    return payload
 
 
 @app.post("/parse")
-async def parse_files(files: List[UploadFile] = File(...)):
+async def parse_files(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    stream: bool = False,
+    compact: bool = False,
+):
+    """
+    Decode uploaded save files and archives
+
+    With stream=true the result is sent as NDJSON, one record per character
+    and share bank as it is decoded followed by the aggregate record, see
+    iter_records. compact=true leaves out the item fields clients can derive,
+    the display strings and raw item data.
+    """
     try:
-        # Initialize the input handler
-        config = Config()
-        Parsers.configure(config)
-        handler = InputHandler(config)
-
-        # Convert uploaded files to bytes
-        file_bytes = []
-        for file in files:
-            contents = await file.read()
-            file.filename = file.filename  # Preserve filename
-            file_bytes.append(contents)
-
-        # Process the files
-        await handler.handle_files(file_bytes)
-
-        # Return processed data
-        return {
-            "characters": handler.characters,
-            "share_banks": handler.share_banks,
-            "all_items": handler.all_items,
-            "normals": handler.normals,
-            "classics": handler.classics,
-        }
+        # The whole request uses the parsers, and so the price guide, that
+        # were current when it started
+        parsers: Parsers = request.app.state.parsers
+        uploads = [(file.filename, await file.read()) for file in files]
+        result_cache: ResultCache = request.app.state.result_cache
+
+        if stream:
+            # Decoded on a thread of this process, the response iterates the
+            # synchronous generator off the event loop
+            return StreamingResponse(
+                iter_records(parsers, uploads, result_cache, compact),
+                media_type="application/x-ndjson",
+            )
+
+        payload = await decode(request.app, parsers, uploads, compact)
+
+        # Already serialized by the worker
+        return Response(content=payload, media_type="application/json")
 
     except Exception as e:
         return JSONResponse(
@@ -42,6 +207,36 @@ async def parse_files(files: List[UploadFile] = File(...)):
         )
 
 
+@app.post("/parse/batch")
+async def parse_batch(
+    request: Request, files: List[UploadFile] = File(...), compact: bool = False
+):
+    """
+    Decode the archives of many accounts at once, compact as for /parse
+
+    Every uploaded file is one account, named after the file. Accounts are
+    decoded in parallel across the worker pool; an account that fails is
+    reported in its own result and the others are still returned, with
+    all_items rolled up across every decoded account.
+    """
+    parsers: Parsers = request.app.state.parsers
+    accounts = [(file.filename, await file.read()) for file in files]
+
+    async def decode_account(filename: str, content: bytes) -> AccountResult:
+        try:
+            return filename, await decode(
+                request.app, parsers, [(filename, content)], compact
+            )
+        except Exception as e:
+            return filename, e
+
+    results = await asyncio.gather(
+        *(decode_account(filename, content) for filename, content in accounts)
+    )
+    payload = await asyncio.to_thread(encode_batch, results)
+    return Response(content=payload, media_type="application/json")
+
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
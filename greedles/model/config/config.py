@@ -4,6 +4,7 @@ from greedles.model.config.item_codes import ItemCodes
 
 class Config:
     def __init__(self, item_codes: ItemCodes):
+        self.LANG = item_codes.lang
         self.ITEM_CODES = item_codes.item_codes()
         self.ELEMENT_CODES = item_codes.element_codes()
         self.SRANK_ELEMENT_CODES = item_codes.srank_element_codes()
@@ -28,6 +29,10 @@ class Config:
         self.EPHINEA_RANGE = (0x031005, 0x031810)
         self.DISK_CODE = 0x0302
 
+        # Item type of every code below ITEM_TYPE_TABLE_SIZE, indexed by item code
+        self.ITEM_TYPE_TABLE_SIZE = 0x060000
+        self.ITEM_TYPE_TABLE = self.build_item_type_table()
+
         #
         self.EPISODE_1_MAX_STAGE = 9
         self.EPISODE_2_MAX_STAGE = 6
@@ -75,6 +80,48 @@ class Config:
             0x0A: "VIRIDIA",
         }
 
+        # Configs are shared between parsers and requests, so they are
+        # read-only once built
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"Config is read-only, cannot set {name}")
+        super().__setattr__(name, value)
+
+    def build_item_type_table(self) -> bytes:
+        """
+        Dense item code -> ItemType table
+
+        Codes past the end are S-rank weapons when their low 16 bits are an
+        S-rank code and OTHER otherwise, see ItemParser.get_item_type.
+        """
+        table = bytearray([self.ItemType.OTHER]) * self.ITEM_TYPE_TABLE_SIZE
+
+        def fill(item_range, item_type):
+            table[item_range[0] : item_range[1] + 1] = bytes([item_type]) * (
+                item_range[1] + 1 - item_range[0]
+            )
+
+        # Lowest priority first, later ranges overwrite earlier ones
+        fill(self.TOOL_RANGE, self.ItemType.TOOL)
+        fill(
+            (self.DISK_CODE << 8, self.DISK_CODE << 8 | 0xFF),
+            self.ItemType.DISK,
+        )
+        fill(self.MAG_RANGE, self.ItemType.MAG)
+        fill(self.UNIT_RANGE, self.ItemType.UNIT)
+        fill(self.BARRIER_RANGE, self.ItemType.BARRIER)
+        fill(self.FRAME_RANGE, self.ItemType.FRAME)
+        fill(self.WEAPON_RANGE, self.ItemType.WEAPON)
+
+        # S-rank weapons match on item_code & 0xFFF0
+        for high in range(0, self.ITEM_TYPE_TABLE_SIZE, 0x10000):
+            for code in self.SRANK_WEAPON_CODES:
+                fill((high | code, high | code | 0x0F), self.ItemType.SRANK_WEAPON)
+
+        return bytes(table)
+
     class ItemType(IntEnum):
         WEAPON = 1
         FRAME = 2
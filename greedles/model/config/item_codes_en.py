@@ -2,6 +2,8 @@ from .item_codes import ItemCodes
 
 
 class ItemCodesEN(ItemCodes):
+    lang = "EN"
+
     def mag_color_codes(self):
         return {
             0x00: ["#FF3319", "Red"],
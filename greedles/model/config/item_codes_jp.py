@@ -1,4 +1,6 @@
 class ItemCodesJP:
+    lang = "JA"
+
     def mag_color_codes():
         return {
             0x00: ["#FF3319", "Red"],
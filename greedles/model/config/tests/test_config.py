@@ -1,3 +1,5 @@
+import pytest
+
 from greedles.model.config.config import Config
 from greedles.model.config.item_codes_en import ItemCodesEN
 
@@ -10,3 +12,41 @@ def test_config():
 def test_item_codes():
     item_codes = ItemCodesEN()
     assert item_codes is not None
+
+
+def test_item_type_table():
+    config = Config(ItemCodesEN())
+
+    def in_range(item_code, item_range):
+        return item_range[0] <= item_code <= item_range[1]
+
+    def item_type(item_code):
+        if item_code & 0xFFF0 in config.SRANK_WEAPON_CODES:
+            return Config.ItemType.SRANK_WEAPON
+        for item_range, item_type in [
+            (config.WEAPON_RANGE, Config.ItemType.WEAPON),
+            (config.FRAME_RANGE, Config.ItemType.FRAME),
+            (config.BARRIER_RANGE, Config.ItemType.BARRIER),
+            (config.UNIT_RANGE, Config.ItemType.UNIT),
+            (config.MAG_RANGE, Config.ItemType.MAG),
+        ]:
+            if in_range(item_code, item_range):
+                return item_type
+        if item_code >> 8 == config.DISK_CODE:
+            return Config.ItemType.DISK
+        if in_range(item_code, config.TOOL_RANGE):
+            return Config.ItemType.TOOL
+        return Config.ItemType.OTHER
+
+    assert len(config.ITEM_TYPE_TABLE) == config.ITEM_TYPE_TABLE_SIZE
+    for item_code in range(0, config.ITEM_TYPE_TABLE_SIZE, 7):
+        assert config.ITEM_TYPE_TABLE[item_code] == item_type(item_code)
+    for item_code in config.ITEM_CODES:
+        assert config.ITEM_TYPE_TABLE[item_code] == item_type(item_code)
+
+
+def test_config_read_only():
+    config = Config(ItemCodesEN())
+    with pytest.raises(AttributeError):
+        config.LANG = "JA"
+    assert config.LANG == "EN"
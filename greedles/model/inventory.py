@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
 
 class Inventory:
@@ -6,3 +6,21 @@ class Inventory:
         self.inventory: Dict[str, List] = inventory
         self.slot: int = slot
         self.meseta: int = meseta
+
+    def items_of_type(self, item_type: int) -> List:
+        """Entries holding items of item_type; lazy items are not decoded"""
+        return [entry for entry in self.inventory if entry[1]["type"] == item_type]
+
+    def prices(self) -> Tuple[float, float, float]:
+        """Total (min, avg, max) price of the items, meseta excluded as in Valuation"""
+        totals = [0.0, 0.0, 0.0]
+        for entry in self.inventory:
+            prices = entry[1].get("prices")
+            if prices:
+                for strategy, price in enumerate(prices):
+                    totals[strategy] += price
+        return tuple(totals)
+
+    def price(self, strategy: int = 0) -> float:
+        """Total price of the items under one BasePriceStrategy"""
+        return self.prices()[strategy]
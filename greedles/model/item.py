@@ -1,2 +1,78 @@
-class Item:
-    pass
+from collections.abc import Mapping
+from typing import Any, Callable, Iterator, Optional
+
+
+class Item(dict):
+    """
+    A decoded item record
+
+    Items are read-only so a single decoded record can be shared between every
+    inventory that holds the same raw item data.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Item is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (Item, (dict(self),))
+
+    @classmethod
+    def freeze(cls, value: Any) -> Any:
+        """Convert decoded item data into read-only Items and tuples"""
+        if isinstance(value, dict):
+            return cls({key: cls.freeze(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return tuple(cls.freeze(item) for item in value)
+        return value
+
+
+class LazyItem(Mapping):
+    """
+    An item record that is decoded on first access
+
+    Only the raw record, its slot index and the classification done while
+    scanning the region are kept. The item code and type can be read without
+    decoding; any other key decodes and prices the record once.
+    """
+
+    def __init__(
+        self,
+        record: bytes,
+        index: int,
+        item_code: int,
+        item_type: int,
+        decode: Callable[[], Item],
+    ):
+        self.record = record
+        self.index = index
+        self.item_code = item_code
+        self.item_type = item_type
+        self._decode = decode
+        self._item: Optional[Item] = None
+
+    @property
+    def decoded(self) -> bool:
+        return self._item is not None
+
+    @property
+    def item(self) -> Item:
+        if self._item is None:
+            self._item = self._decode()
+        return self._item
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "type" and self._item is None:
+            return self.item_type
+        return self.item[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.item)
+
+    def __len__(self) -> int:
+        return len(self.item)
+
+    def __reduce__(self):
+        return (Item, (dict(self.item),))
@@ -0,0 +1,184 @@
+from collections.abc import Mapping
+from enum import Enum
+from typing import Any, Dict, FrozenSet, List, Optional, Union
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+from greedles.model.bank import Bank
+from greedles.model.character import Character
+from greedles.model.inventory import Inventory
+from greedles.model.item import Item
+
+# Serialized attributes of each model, in output order
+CHARACTER_FIELDS = (
+    "slot",
+    "mode",
+    "name",
+    "guild_card_number",
+    "character_class",
+    "section_id",
+    "level",
+    "experience",
+    "ep1_progress",
+    "ep2_progress",
+)
+BANK_FIELDS = ("slot", "mode")
+INVENTORY_FIELDS = ("slot", "meseta")
+
+# Item fields kept on the model for the Repricer but never serialized:
+# pricing only records which guide entries priced the item
+INTERNAL_ITEM_FIELDS: FrozenSet[str] = frozenset(("pricing",))
+
+# Item fields a client can derive from the others: the display strings are
+# built from the decoded fields and itemdata is the raw record they were
+# decoded from
+DERIVED_ITEM_FIELDS: FrozenSet[str] = INTERNAL_ITEM_FIELDS | frozenset(
+    ("display", "display_front", "display_end", "itemdata")
+)
+
+
+class Serializer:
+    """
+    JSON serializer of decoded characters, share banks and inventories
+
+    Models are written through explicit schemas rather than their __dict__,
+    with orjson when it is installed. Items leave out their
+    INTERNAL_ITEM_FIELDS, the compact serializer all their
+    DERIVED_ITEM_FIELDS.
+    """
+
+    def __init__(self, compact: bool = False, excluded: Optional[FrozenSet] = None):
+        self.compact = compact
+        if excluded is None:
+            excluded = DERIVED_ITEM_FIELDS if compact else INTERNAL_ITEM_FIELDS
+        self.excluded = excluded
+        self.options = 0
+        if orjson is not None:
+            # Items are dicts, they only reach default() to be trimmed when
+            # subclasses are not written natively
+            self.options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_SUBCLASS
+
+    def dumps(self, payload: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(payload, default=self.default, option=self.options)
+        return json.dumps(self.builtin(payload), separators=(",", ":")).encode()
+
+    def default(self, value: Any) -> Any:
+        """Serializable form of a value the encoder does not write itself"""
+        if isinstance(value, Character):
+            return self.character(value)
+        if isinstance(value, Bank):
+            return self.bank(value)
+        if isinstance(value, Inventory):
+            return self.inventory(value)
+        if isinstance(value, Mapping):
+            return self.item(value)
+        if isinstance(value, Enum):
+            return value.value
+        # Subclasses of builtins passed through by orjson
+        for builtin in (int, float, str, list, tuple):
+            if isinstance(value, builtin):
+                return builtin(value)
+        raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+    def character(self, character: Character) -> Dict[str, Any]:
+        serialized = {field: getattr(character, field) for field in CHARACTER_FIELDS}
+        serialized["inventory"] = character.inventory
+        serialized["bank"] = character.bank
+        return serialized
+
+    def bank(self, bank: Bank) -> Dict[str, Any]:
+        serialized: Dict[str, Any] = {"inventory": bank.inventory}
+        serialized.update((field, getattr(bank, field)) for field in BANK_FIELDS)
+        return serialized
+
+    def inventory(self, inventory: Inventory) -> Dict[str, Any]:
+        serialized: Dict[str, Any] = {"inventory": inventory.inventory}
+        serialized.update(
+            (field, getattr(inventory, field)) for field in INVENTORY_FIELDS
+        )
+        return serialized
+
+    def item(self, item: Mapping) -> Dict[str, Any]:
+        """An item record without its excluded fields, decoding lazy items"""
+        return {key: value for key, value in item.items() if key not in self.excluded}
+
+    def builtin(self, value: Any) -> Any:
+        """value as plain dicts and lists, for the json module"""
+        if isinstance(value, (list, tuple)):
+            return [self.builtin(item) for item in value]
+        if type(value) is dict:
+            return {key: self.builtin(item) for key, item in value.items()}
+        if isinstance(value, (Character, Bank, Inventory, Mapping)):
+            return self.builtin(self.default(value))
+        if isinstance(value, Enum):
+            return value.value
+        return value
+
+
+# Shared serializers, they keep no per-payload state
+SERIALIZER = Serializer()
+COMPACT_SERIALIZER = Serializer(compact=True)
+# Keeps every item field, models written by it are read back by load_model
+MODEL_SERIALIZER = Serializer(excluded=frozenset())
+
+
+def dumps(payload: Any, compact: bool = False) -> bytes:
+    """Serialize decoded models, or results holding them, to JSON bytes"""
+    return (COMPACT_SERIALIZER if compact else SERIALIZER).dumps(payload)
+
+
+def dump_model(model: Union[Character, Bank]) -> bytes:
+    """A decoded character or share bank as JSON, with every item field"""
+    kind = "character" if isinstance(model, Character) else "share_bank"
+    return MODEL_SERIALIZER.dumps({kind: model})
+
+
+def load_model(payload: bytes) -> Union[Character, Bank]:
+    """Rebuild the character or share bank written by dump_model"""
+    data = orjson.loads(payload) if orjson is not None else json.loads(payload)
+    if "character" in data:
+        return load_character(data["character"])
+    return load_bank(data["share_bank"])
+
+
+def load_character(data: Dict[str, Any]) -> Character:
+    return Character(
+        **{field: data[field] for field in CHARACTER_FIELDS},
+        inventory=load_inventory(data["inventory"]),
+        bank=load_bank(data["bank"]),
+    )
+
+
+def load_bank(data: Dict[str, Any]) -> Bank:
+    return Bank(load_inventory(data["inventory"]), data["slot"], data["mode"])
+
+
+def load_inventory(data: Dict[str, Any]) -> Inventory:
+    entries: List[List[Any]] = [
+        [code, load_item(item), *rest] for code, item, *rest in data["inventory"]
+    ]
+    return Inventory(entries, data["slot"], data["meseta"])
+
+
+def load_item(value: Any) -> Any:
+    """
+    Item data read back from JSON, frozen as when it was decoded
+
+    JSON keys are strings, the integer keys of e.g. frame additions are
+    restored.
+    """
+    if isinstance(value, dict):
+        return Item(
+            {
+                int(key) if key.isdigit() else key: load_item(item)
+                for key, item in value.items()
+            }
+        )
+    if isinstance(value, list):
+        return tuple(load_item(item) for item in value)
+    return value
@@ -0,0 +1,117 @@
+"""
+Test the JSON serializer of the decoded models
+"""
+
+import json
+
+import pytest
+
+from greedles.model import serializer
+from greedles.model.bank import Bank
+from greedles.model.character import Character
+from greedles.model.config.config import Config
+from greedles.model.inventory import Inventory
+from greedles.model.item import Item, LazyItem
+
+MONOMATE = Item(
+    {
+        "name": "Monomate",
+        "type": Config.ItemType.TOOL,
+        "itemdata": "030000000005",
+        "number": 5,
+        "display": "Monomate x5",
+        "prices": (0.0, 0.0, 0.0),
+        "pricing": {"kind": "tool", "args": ("Monomate", 5), "sources": ()},
+    }
+)
+
+
+def character() -> Character:
+    inventory = Inventory([["030000", MONOMATE, 1]], 1, 0)
+    bank = Bank(Inventory([], 1, 0), 1, Config.Mode.NORMAL)
+    return Character(
+        1,
+        "First",
+        Config.Mode.NORMAL,
+        "42",
+        "HUmar",
+        "VIRIDIA",
+        1,
+        0,
+        "",
+        "",
+        inventory,
+        bank,
+    )
+
+
+@pytest.fixture(params=[True, False], ids=["orjson", "json"])
+def encoder(request, monkeypatch):
+    if request.param:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(serializer, "orjson", None)
+
+
+def test_character(encoder):
+    result = json.loads(serializer.dumps({"characters": [character()]}))
+
+    [serialized] = result["characters"]
+    assert list(serialized) == [*serializer.CHARACTER_FIELDS, "inventory", "bank"]
+    assert serialized["mode"] == 0
+    # pricing is only kept on the model, for the Repricer
+    item = {key: value for key, value in MONOMATE.items() if key != "pricing"}
+    assert serialized["inventory"]["inventory"] == [
+        ["030000", json.loads(json.dumps(item)), 1]
+    ]
+    assert serialized["bank"] == {
+        "inventory": {"inventory": [], "slot": 1, "meseta": 0},
+        "slot": 1,
+        "mode": 0,
+    }
+
+
+def test_compact(encoder):
+    payload = {"characters": [character()], "all_items": [["030000", MONOMATE, 1]]}
+    result = json.loads(serializer.dumps(payload, compact=True))
+
+    item = {"name": "Monomate", "type": 7, "number": 5, "prices": [0.0, 0.0, 0.0]}
+    assert result["characters"][0]["inventory"]["inventory"] == [["030000", item, 1]]
+    assert result["all_items"] == [["030000", item, 1]]
+
+
+def test_lazy_item(encoder):
+    lazy = LazyItem(b"", 0, 0x030000, Config.ItemType.TOOL, lambda: MONOMATE)
+
+    assert json.loads(serializer.dumps([lazy], compact=True))[0]["name"] == "Monomate"
+
+
+def test_unknown_type(encoder):
+    with pytest.raises(TypeError):
+        serializer.dumps({"value": object()})
+
+
+def test_load_model(encoder):
+    frame = Item.freeze(
+        {
+            "name": "Frame",
+            "type": Config.ItemType.FRAME,
+            "addition": {Config.AdditionType.DEF: 2},
+            "prices": [0.0, 0.0, 0.0],
+            "pricing": {"kind": "frame", "args": ["Frame", {2: 2}], "sources": []},
+        }
+    )
+    inventory = Inventory([["010100", frame, 1], ["030000", MONOMATE, 1]], 1, 0)
+    bank = Bank(inventory, "ShareBank", Config.Mode.CLASSIC)
+
+    loaded = serializer.load_model(serializer.dump_model(bank))
+
+    assert isinstance(loaded, Bank)
+    assert (loaded.slot, loaded.mode) == ("ShareBank", Config.Mode.CLASSIC)
+    # Every field is kept, integer keys and tuples included
+    assert loaded.inventory.inventory == inventory.inventory
+    assert isinstance(loaded.inventory.inventory[0][1], Item)
+
+    loaded = serializer.load_model(serializer.dump_model(character()))
+    assert isinstance(loaded, Character)
+    assert loaded.inventory.inventory == [["030000", MONOMATE, 1]]
@@ -0,0 +1,44 @@
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+import logging
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+# Member names containing one of these are save files the parsers understand
+SAVE_FILE_MARKERS = ("psochar", "psobank", "psoclassicbank")
+
+
+def is_save_file(name: str) -> bool:
+    name = name.lower()
+    return any(marker in name for marker in SAVE_FILE_MARKERS)
+
+
+def is_archive(name: str) -> bool:
+    return name.lower().endswith(".zip")
+
+
+def iter_save_files(
+    archive: BinaryIO, sort_key: Optional[Callable[[str], Tuple]] = None
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    Yield (name, data) for every save file in a zip archive
+
+    archive is any seekable binary file object, e.g. a request body spooled by
+    the web framework, so nothing is written to disk. Members are decompressed
+    one at a time as the caller asks for them, letting each be decoded before
+    the next is inflated. The member list comes from the central directory, so
+    sort_key can order members without decompressing anything.
+    """
+    with zipfile.ZipFile(archive) as zip_file:
+        members = [
+            info
+            for info in zip_file.infolist()
+            if not info.is_dir() and is_save_file(info.filename)
+        ]
+        if sort_key is not None:
+            members.sort(key=lambda info: sort_key(info.filename))
+
+        for info in members:
+            logger.debug(f"decompressing {info.filename} ({info.file_size} bytes)")
+            with zip_file.open(info) as member:
+                yield info.filename, member.read()
@@ -1,24 +1,45 @@
+from typing import Optional
+
 from greedles.model.config.config import Config
 from greedles.model.bank import Bank
 from greedles.parser.inventory_parser import InventoryParser
+from greedles.parser.record_layout import SHARE_BANK_LAYOUT
+from greedles.price_guide.price_guide import PriceGuideAbstract
 
 
 class BankParser:
-    def __init__(self, config: Config):
+    layout = SHARE_BANK_LAYOUT
+
+    def __init__(
+        self, config: Config, price_guide: PriceGuideAbstract, lazy: bool = False
+    ):
         self.config = config
+        self.price_guide = price_guide
+        self.lazy = lazy
+        self.inventory_parser = InventoryParser(config, price_guide, lazy=lazy)
 
-    def parse(self, bank_data: bytes, slot: int) -> Bank:
-        inventory_parser = InventoryParser(self.config)
-        inventory = inventory_parser.parse(bank_data)
-        slot = self._parse_slot(slot)
+    def parse(
+        self,
+        bank_data: bytes,
+        slot: int,
+        lang: Config.Lang = Config.Lang.EN,
+        item_count: Optional[int] = None,
+    ) -> Bank:
+        inventory = self.inventory_parser.parse(bank_data, slot, lang, item_count)
         mode = self._parse_mode(slot)
+        slot = self._parse_slot(slot)
 
         return Bank(inventory, slot, mode)
 
-    def _parse_slot(self, slot: int) -> None:
-        """Set the slot name based on mode"""
-        self.slot = "ShareBank(Classic)" if slot != Config.Mode.NORMAL else "ShareBank"
+    def parse_share_bank(self, bank_file: bytes, mode: int) -> Bank:
+        """Parse a .psobank or .psoclassicbank file"""
+        regions = self.layout.slice_regions(memoryview(bank_file))
+        return self.parse(regions["bank"], mode)
+
+    def _parse_slot(self, slot: int) -> str:
+        """Slot name based on mode"""
+        return "ShareBank(Classic)" if slot != Config.Mode.NORMAL else "ShareBank"
 
-    def _parse_mode(self, slot: int) -> None:
-        """Set the mode value"""
-        self.mode = slot
+    def _parse_mode(self, slot: int) -> int:
+        """Mode value"""
+        return slot
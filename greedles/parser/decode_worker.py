@@ -0,0 +1,273 @@
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+import io
+import json
+import logging
+import os
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+from greedles.model import serializer
+from greedles.model.character import Character
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.parser.archive import is_archive, is_save_file, iter_save_files
+from greedles.parser.parser import InputHandler, Parsers
+from greedles.parser.result_cache import ResultCache, content_digest, content_key
+from greedles.price_guide.price_guide import PriceGuideException, PriceGuideFixed
+
+logger = logging.getLogger(__name__)
+
+# Uploaded (filename, content) pairs, as sent to a worker process
+Upload = Tuple[str, bytes]
+
+# (account, serialized parse result or the exception that failed it)
+AccountResult = Tuple[str, Union[bytes, Exception]]
+
+# Parsers of this worker process, built once by init_worker
+_parsers: Optional[Parsers] = None
+_price_guide_directory: Optional[Path] = None
+_price_guide_snapshot: Optional[Path] = None
+_result_cache: Optional[ResultCache] = None
+
+
+def iter_uploads(files: Iterable[Tuple[str, BinaryIO]]) -> Iterator[Tuple[str, bytes]]:
+    """
+    (name, data) of every save file in the uploaded (filename, file) pairs
+
+    Zip archives are read straight from their file object and each member is
+    handed on as soon as it is decompressed.
+    """
+    for filename, file in files:
+        if is_archive(filename):
+            yield from iter_save_files(file, InputHandler.input_file_sort_key)
+        elif is_save_file(filename):
+            yield filename, file.read()
+
+
+def encode_payload(payload: Any, compact: bool = False) -> bytes:
+    """Serialize a parse result, compact leaves out derivable item fields"""
+    return serializer.dumps(payload, compact)
+
+
+def decode_payload(payload: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def result_payload(handler: InputHandler) -> Dict[str, Any]:
+    return {
+        "characters": handler.characters,
+        "share_banks": handler.share_banks,
+        "all_items": handler.all_items,
+        "normals": handler.normals,
+        "classics": handler.classics,
+    }
+
+
+def rollup_all_items(accounts: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    all_items of decoded accounts merged into one
+
+    Entries become [code, item, slot, account, index]: the account is added
+    and the index is renumbered over the merged, sorted inventories.
+    """
+    all_items = [
+        {
+            "Slot": "AllItems",
+            "Mode": Config.Mode.NORMAL,
+            "Inventory": {"JA": [], "EN": []},
+        },
+        {
+            "Slot": "AllItems(Classic)",
+            "Mode": Config.Mode.CLASSIC,
+            "Inventory": {"JA": [], "EN": []},
+        },
+    ]
+    for account, account_items in accounts:
+        for items in account_items:
+            rollup = all_items[items["Mode"]]["Inventory"]
+            for lang, entries in items["Inventory"].items():
+                rollup[lang].extend(entry[:3] + [account] for entry in entries)
+
+    for items in all_items:
+        for lang, entries in items["Inventory"].items():
+            entries = InputHandler.sort_inventory(entries)
+            for index, entry in enumerate(entries):
+                entry.append(index)
+            items["Inventory"][lang] = entries
+    return all_items
+
+
+def encode_batch(results: List[AccountResult]) -> bytes:
+    """
+    Serialize the results of a batch of accounts
+
+    The parse result of every account is embedded as it was serialized, only
+    all_items is read back to be rolled up.
+    """
+    accounts = []
+    decoded = []
+    for account, result in results:
+        name = encode_payload(account)
+        if isinstance(result, Exception):
+            error = encode_payload(f"Failed to process files: {str(result)}")
+            accounts.append(
+                b'{"account":%s,"status":"error","error":%s}' % (name, error)
+            )
+            continue
+        accounts.append(b'{"account":%s,"status":"ok","result":%s}' % (name, result))
+        # Accounts without save files have no all_items
+        all_items = decode_payload(result)["all_items"]
+        if all_items:
+            decoded.append((account, all_items))
+
+    all_items = encode_payload(rollup_all_items(decoded))
+    return b'{"accounts":[%s],"all_items":%s}' % (b",".join(accounts), all_items)
+
+
+def iter_upload_contents(uploads: List[Upload]) -> Iterator[Tuple[str, bytes]]:
+    files = ((filename, io.BytesIO(content)) for filename, content in uploads)
+    return iter_uploads(files)
+
+
+def upload_key(parsers: Parsers, uploads: List[Upload], compact: bool = False) -> str:
+    """Result cache key of a whole upload"""
+    parts = []
+    for filename, content in uploads:
+        parts.extend((filename, content_digest(content)))
+    return content_key(
+        "compact upload" if compact else "upload",
+        parsers.config.LANG,
+        parsers.price_guide.version or "",
+        *parts,
+    )
+
+
+def decode_uploads(
+    parsers: Parsers,
+    uploads: List[Upload],
+    result_cache: Optional[ResultCache] = None,
+    compact: bool = False,
+) -> bytes:
+    """Decode uploaded files and return the serialized parse result"""
+    handler = InputHandler(parsers.config, parsers=parsers, result_cache=result_cache)
+    for _ in handler.decode_stream(iter_upload_contents(uploads)):
+        pass
+    return encode_payload(result_payload(handler), compact)
+
+
+def encode_record(record: Dict[str, Any], compact: bool = False) -> bytes:
+    return encode_payload(record, compact) + b"\n"
+
+
+def iter_records(
+    parsers: Parsers,
+    uploads: List[Upload],
+    result_cache: Optional[ResultCache] = None,
+    compact: bool = False,
+) -> Iterator[bytes]:
+    """
+    Decode uploaded files as NDJSON records
+
+    A {"type": "character"} or {"type": "share_bank"} record is yielded as
+    soon as each file is decoded, then one {"type": "result"} record with
+    what needs every file: all_items and the per item type lists of the
+    normal and classic modes. A failure ends the stream with a
+    {"type": "error"} record.
+    """
+    handler = InputHandler(parsers.config, parsers=parsers, result_cache=result_cache)
+    try:
+        for model in handler.decode_stream(iter_upload_contents(uploads)):
+            kind = "character" if isinstance(model, Character) else "share_bank"
+            yield encode_record({"type": kind, kind: model}, compact)
+
+        yield encode_record(
+            {
+                "type": "result",
+                "characters": len(handler.characters),
+                "share_banks": len(handler.share_banks),
+                "all_items": handler.all_items,
+                "normals": handler.normals,
+                "classics": handler.classics,
+            },
+            compact,
+        )
+    except Exception as e:
+        logger.exception("Failed to decode upload")
+        yield encode_record(
+            {"type": "error", "error": f"Failed to process files: {str(e)}"}
+        )
+
+
+def init_worker(
+    price_guide_directory: Path,
+    price_guide_snapshot: Optional[Path] = None,
+    result_cache_directory: Optional[Path] = None,
+) -> None:
+    """
+    Build the config, price guide and parsers of a worker process once
+
+    The guide is loaded from the snapshot the server keeps current, so a new
+    worker starts without compiling the price files. Each worker caches the
+    files it decoded, sharing the disk tier in result_cache_directory if one
+    is configured.
+    """
+    global _parsers, _price_guide_directory, _price_guide_snapshot, _result_cache
+    _price_guide_directory = price_guide_directory
+    _price_guide_snapshot = price_guide_snapshot
+    _result_cache = ResultCache(result_cache_directory)
+    config = Config(ItemCodesEN())
+    price_guide = PriceGuideFixed(price_guide_directory, price_guide_snapshot)
+    _parsers = Parsers(config, price_guide)
+    logger.info(f"Decode worker {os.getpid()} uses price guide {price_guide.version}")
+
+
+def worker_price_guide_version() -> Optional[str]:
+    """Version of the price guide of this worker process"""
+    return _parsers.price_guide.version if _parsers is not None else None
+
+
+def decode_in_worker(
+    uploads: List[Upload], price_guide_version: str, compact: bool = False
+) -> Tuple[Optional[str], bytes]:
+    """
+    decode_uploads with the parsers of this worker process
+
+    The guide is reloaded first when the server swapped in other prices since
+    the worker was started. The price files may have changed again since, or
+    fail to build, so the version the result was priced with is returned
+    along with it; a failed build keeps the current guide, as the reloader
+    does.
+    """
+    global _parsers
+    if _parsers.price_guide.version != price_guide_version:
+        try:
+            price_guide = PriceGuideFixed(_price_guide_directory, _price_guide_snapshot)
+        except PriceGuideException as e:
+            logger.error(
+                f"Decode worker {os.getpid()} keeps price guide "
+                f"{_parsers.price_guide.version}: {e}"
+            )
+        else:
+            logger.info(
+                f"Decode worker {os.getpid()} price guide "
+                f"{_parsers.price_guide.version} -> {price_guide.version}"
+            )
+            _parsers = Parsers(_parsers.config, price_guide)
+    payload = decode_uploads(_parsers, uploads, _result_cache, compact)
+    return _parsers.price_guide.version, payload
@@ -1,26 +1,72 @@
-from typing import Dict, List
+from functools import partial
+from typing import List, Optional, Tuple
 import logging
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
 from greedles.model.common_util import binary_array_to_int, binary_array_to_hex
 from greedles.model.config.config import Config
 from greedles.model.inventory import Inventory
+from greedles.model.item import Item, LazyItem
+from greedles.parser.item_cache import ItemCache
 from greedles.parser.item_parser import ItemParser
+from greedles.price_guide.price_guide import PriceGuideAbstract
 
 logger = logging.getLogger(__name__)
 
+# Byte pattern found in slots the game has emptied but not zeroed
+BLANK_RECORD_MARKER = bytes([0x00, 0xFF] + [0x00] * 10 + [0xFF] * 4)
+BLANK_RECORD = bytes([0x00] * 12 + [0xFF] * 4 + [0x00] * 8)
+
 
 class InventoryParser:
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        price_guide: PriceGuideAbstract,
+        batch: bool = np is not None,
+        lazy: bool = False,
+        cache: Optional[ItemCache] = None,
+    ):
         self.config = config
+        # Decoded items, the shared item_cache unless cache is given
+        self.item_parser = ItemParser(config, price_guide, cache)
+        # Decode the whole region with array operations (requires numpy)
+        self.batch = batch and np is not None
+        # Keep raw records and decode each item on first access
+        self.lazy = lazy
 
     def parse(
         self,
         inventory_data: bytes,
         slot: str,
         lang: Config.Lang,
+        item_count: Optional[int] = None,
     ) -> Inventory:
-        """Parse inventory data"""
-        inventory_list = self._parse_inventory(inventory_data, 28, slot, lang.value)
+        """
+        Parse inventory data
+
+        item_count is the container's item-count header, when the caller has one.
+        Scanning stops once that many occupied slots have been found.
+        """
+        # Records are sliced as views of the caller's buffer, never copied
+        inventory_data = memoryview(inventory_data)
+        item_count = self._check_item_count(item_count, len(inventory_data) // 28)
+        if self.lazy:
+            inventory_list = self._parse_inventory_lazy(
+                inventory_data, 28, slot, lang.value, item_count
+            )
+        elif self.batch:
+            inventory_list = self._parse_inventory_batch(
+                inventory_data, 28, slot, lang.value, item_count
+            )
+        else:
+            inventory_list = self._parse_inventory(
+                inventory_data, 28, slot, lang.value, item_count
+            )
 
         meseta_data = inventory_data[884:887]
         meseta = self._parse_meseta(meseta_data, inventory_list, slot, lang.value)
@@ -29,20 +75,35 @@ class InventoryParser:
 
         return inventory
 
+    def _check_item_count(
+        self, item_count: Optional[int], capacity: int
+    ) -> Optional[int]:
+        """Ignore item-count headers that cannot be right for the region"""
+        if item_count is not None and not 0 <= item_count <= capacity:
+            logger.warning(
+                f"item count {item_count} exceeds capacity {capacity}, scanning all slots"
+            )
+            return None
+        return item_count
+
     def _parse_inventory(
         self,
         items_data: bytes,
         length: int,
         slot: str,
         lang: str,
+        item_count: Optional[int] = None,
     ) -> List[List[str]]:
         """Set inventory items from binary data"""
         logger.debug("====== itemsData ======")
         logger.debug(items_data)
 
         array = []
-        # Loop through all item areas by item unit
-        for i in range(0, len(items_data), length):
+        # Loop through all whole item records, a partial record at the end of
+        # the region is padding
+        for i in range(0, len(items_data) // length * length, length):
+            if len(array) == item_count:
+                break
             logger.debug("============ item data start ============")
             logger.debug(
                 f"item number:{i // length}, index:{i}, length:{length}, end:{i + length}"
@@ -61,8 +122,7 @@ class InventoryParser:
             item_code_hex = binary_array_to_hex(item_data[:3])
             logger.debug(f"item code: {item_code_hex}")
 
-            item_parser = ItemParser(self.config)
-            item = item_parser.parse(item_data, item_code, lang)
+            item = self.item_parser.parse(item_data, item_code, lang)
             logger.debug(f"item name: {item['display']}")
 
             # Add item info to inventory list
@@ -70,19 +130,144 @@ class InventoryParser:
 
         return array
 
+    def _parse_inventory_batch(
+        self,
+        items_data: bytes,
+        length: int,
+        slot: str,
+        lang: str,
+        item_count: Optional[int] = None,
+    ) -> List[List[str]]:
+        """Set inventory items from binary data, classifying all slots at once"""
+        located = self._locate_items(items_data, length, item_count)
+        records = [
+            items_data[index * length : (index + 1) * length] for index, _, _ in located
+        ]
+        # Only occupied slots reach the per-type formatting step
+        items = self.item_parser.parse_many(
+            records,
+            lang,
+            [item_code for _, item_code, _ in located],
+            [item_type for _, _, item_type in located],
+        )
+
+        return [
+            [f"{item_code:06X}", item, slot]
+            for (_, item_code, _), item in zip(located, items)
+        ]
+
+    def _parse_inventory_lazy(
+        self,
+        items_data: bytes,
+        length: int,
+        slot: str,
+        lang: str,
+        item_count: Optional[int] = None,
+    ) -> List[List[str]]:
+        """Set inventory items that are only decoded when they are read"""
+        array = []
+        located = self._locate_items(items_data, length, item_count)
+        for index, item_code, item_type in located:
+            item_data = items_data[index * length : (index + 1) * length]
+            decode = partial(
+                self.item_parser.parse, item_data, item_code, lang, item_type
+            )
+            item = LazyItem(item_data, index, item_code, item_type, decode)
+            array.append([f"{item_code:06X}", item, slot])
+
+        return array
+
+    def _locate_items(
+        self, items_data: bytes, length: int, item_count: Optional[int] = None
+    ) -> List[Tuple[int, int, int]]:
+        """(slot index, item code, item type) of every occupied record"""
+        if self.batch:
+            records = self.records_array(items_data, length)
+            if item_count is None:
+                occupied = np.flatnonzero(~self.blank_mask(records))
+            else:
+                # Items are normally packed at the front of the container
+                occupied = np.flatnonzero(~self.blank_mask(records[:item_count]))
+                if len(occupied) < item_count:
+                    occupied = np.flatnonzero(~self.blank_mask(records))
+                    occupied = occupied[:item_count]
+            item_codes = self.item_codes_array(records[occupied])
+            item_types = self.item_types_array(item_codes)
+            return list(
+                zip(occupied.tolist(), item_codes.tolist(), item_types.tolist())
+            )
+
+        located = []
+        for index in range(len(items_data) // length):
+            if len(located) == item_count:
+                break
+            item_data = items_data[index * length : (index + 1) * length]
+            if self.is_blank(item_data):
+                continue
+            item_code = binary_array_to_int(item_data[:3])
+            located.append(
+                (index, item_code, self.item_parser.get_item_type(item_code))
+            )
+        return located
+
+    @staticmethod
+    def records_array(items_data: bytes, length: int) -> "np.ndarray":
+        """View the item region as an (N, length) array of records"""
+        count = len(items_data) // length
+        return np.frombuffer(items_data, dtype=np.uint8, count=count * length).reshape(
+            count, length
+        )
+
+    @staticmethod
+    def blank_mask(records: "np.ndarray") -> "np.ndarray":
+        """Vectorized is_blank over an (N, length) array of records"""
+        blank = ~records[:, :20].any(axis=1)
+        if records.shape[1] == len(BLANK_RECORD):
+            blank |= (records == np.frombuffer(BLANK_RECORD, dtype=np.uint8)).all(
+                axis=1
+            )
+        if records.shape[1] >= len(BLANK_RECORD_MARKER):
+            windows = np.lib.stride_tricks.sliding_window_view(
+                records, len(BLANK_RECORD_MARKER), axis=1
+            )
+            marker = np.frombuffer(BLANK_RECORD_MARKER, dtype=np.uint8)
+            blank |= (windows == marker).all(axis=2).any(axis=1)
+        return blank
+
+    @staticmethod
+    def item_codes_array(records: "np.ndarray") -> "np.ndarray":
+        """24-bit big-endian item codes from the first three bytes of each record"""
+        codes = records[:, :3].astype(np.uint32)
+        return codes[:, 0] << 16 | codes[:, 1] << 8 | codes[:, 2]
+
+    def item_types_array(self, item_codes: "np.ndarray") -> "np.ndarray":
+        """Vectorized ItemParser.get_item_type through Config.ITEM_TYPE_TABLE"""
+        table = np.frombuffer(self.config.ITEM_TYPE_TABLE, dtype=np.uint8)
+        in_table = item_codes < len(table)
+        srank = np.isin(item_codes & 0xFFF0, list(self.config.SRANK_WEAPON_CODES))
+        return np.where(
+            in_table,
+            table[np.where(in_table, item_codes, 0)],
+            np.where(
+                srank, self.config.ItemType.SRANK_WEAPON, self.config.ItemType.OTHER
+            ),
+        )
+
     def _parse_meseta(
-        self, meseta_data: bytes, inventory: Dict[str, List], slot: str, lang: str
-    ) -> None:
+        self, meseta_data: bytes, inventory: List[List[str]], slot: str, lang: str
+    ) -> int:
         """Set meseta (currency) amount"""
         name = "MESETA" if lang == "EN" else "メセタ"
         meseta = (meseta_data[2] << 8 | meseta_data[1]) << 8 | meseta_data[0]
-        item = {
-            "type": 10,
-            "name": name,
-            "value": meseta,
-            "display": f"{meseta} {name}",
-        }
-        inventory[lang].append(
+        item = Item(
+            {
+                "type": 10,
+                "name": name,
+                "value": meseta,
+                "display": f"{meseta} {name}",
+            }
+        )
+        inventory.append(
             [
                 "09"
                 + str(meseta).zfill(7),  # Add prefix to make meseta maximum item code
@@ -90,13 +275,13 @@ class InventoryParser:
                 slot,
             ]
         )
+        return meseta
 
     def is_blank(self, item_data: bytes) -> bool:
         """Check if item slot is empty"""
+        item_data = bytes(item_data)
         return (
-            sum(item_data[:20]) == 0
-            or binary_array_to_hex(item_data)
-            == "000000000000000000000000FFFFFFFF0000000000000000"
-            or binary_array_to_hex(item_data).find("00FF00000000000000000000FFFFFFFF")
-            != -1
+            not any(item_data[:20])
+            or item_data == BLANK_RECORD
+            or BLANK_RECORD_MARKER in item_data
         )
@@ -0,0 +1,68 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Optional
+
+from greedles.model.item import Item
+
+
+class ItemCache:
+    """
+    Bounded LRU cache of decoded items keyed by their raw record bytes
+
+    The same raw records recur constantly (stacks of tools, identical units,
+    duplicate mags across mules), so ItemParser looks records up here before
+    decoding and pricing them.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self.items: "OrderedDict[Hashable, Item]" = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Item]:
+        with self.lock:
+            item = self.items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self.items.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key: Hashable, item: Any) -> Item:
+        """Store a decoded item, returning the read-only copy that was cached"""
+        item = Item.freeze(item)
+        if self.maxsize <= 0:
+            return item
+        with self.lock:
+            self.items[key] = item
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+                self.evictions += 1
+        return item
+
+    def clear(self) -> None:
+        with self.lock:
+            self.items.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.items),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared by every ItemParser that is not given its own cache
+item_cache = ItemCache()
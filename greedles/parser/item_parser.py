@@ -1,38 +1,177 @@
-from typing import Dict, List, Union
-from pytest import Item
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+from greedles.model.item import Item
 from greedles.model.config.config import Config
-from greedles.model.common_util import binary_array_to_hex, int_to_hex
-from greedles.price_guide.price_guide import PriceGuideAbstract
+from greedles.model.common_util import (
+    binary_array_to_hex,
+    binary_array_to_int,
+    int_to_hex,
+)
+from greedles.parser.item_cache import ItemCache, item_cache
+from greedles.price_guide.price_guide import (
+    PriceGuideAbstract,
+    PriceGuideException,
+    PriceGuideExceptionItemNameNotFound,
+)
+from greedles.price_guide.price_table import ZERO_PRICE
+
+logger = logging.getLogger(__name__)
+
+
+def price_item(price_guide: PriceGuideAbstract, kind: str, *args) -> Dict[str, Any]:
+    """
+    Price an item with price_guide.get_prices_<kind>(*args), treating items
+    missing from the guide as worthless
+
+    Other price guide errors are logged and priced at 0 too; any other
+    exception, e.g. from a broken guide entry, is raised.
+
+    Returns the item's "prices" and "pricing" fields. "pricing" records the
+    call and the price guide entries it read, so the item can be repriced
+    without decoding it again.
+    """
+    try:
+        prices = getattr(price_guide, f"get_prices_{kind}")(*args)
+    except PriceGuideExceptionItemNameNotFound as e:
+        logger.debug(f"no price for {args[0]}: {e}")
+        prices = ZERO_PRICE
+    except PriceGuideException as e:
+        # e.g. an unknown S-rank ability, the item is still listed at 0
+        logger.warning(f"could not price {args[0]}: {e}")
+        prices = ZERO_PRICE
+    return {
+        "prices": prices,
+        "pricing": {
+            "kind": kind,
+            "args": list(args),
+            "sources": price_guide.price_sources(kind, *args),
+        },
+    }
 
 
 class ItemParser:
-    def __init__(self, config: Config, price_guide: PriceGuideAbstract):
+    def __init__(
+        self,
+        config: Config,
+        price_guide: PriceGuideAbstract,
+        cache: Optional[ItemCache] = None,
+    ):
         self.config = config
         self.price_guide = price_guide
+        self.cache = item_cache if cache is None else cache
+        self.item_type_table = config.ITEM_TYPE_TABLE
+        # Item type -> decoder for that type
+        self.handlers: Dict[int, Callable[[int, bytes], Dict]] = {
+            config.ItemType.SRANK_WEAPON: self.s_rank_weapon,
+            config.ItemType.WEAPON: self.weapon,
+            config.ItemType.FRAME: self.frame,
+            config.ItemType.BARRIER: self.barrier,
+            config.ItemType.UNIT: self.unit,
+            config.ItemType.MAG: self.mag,
+            config.ItemType.DISK: self.disk,
+            config.ItemType.TOOL: self.tool,
+            config.ItemType.OTHER: self.other,
+        }
+        # Item type -> decoder for many records of that type at once
+        self.batch_handlers: Dict[
+            int, Callable[[Sequence[int], Sequence[bytes]], List[Dict]]
+        ] = {
+            config.ItemType.WEAPON: self.weapons,
+            config.ItemType.MAG: self.mags,
+            config.ItemType.DISK: self.disks,
+        }
+
+    def parse(
+        self,
+        item_data: bytes,
+        item_code: int,
+        lang: str,
+        item_type: Optional[int] = None,
+    ) -> Item:
+        key = self.cache_key(item_data, lang)
+        item = self.cache.get(key)
+        if item is not None:
+            return item
+
+        if item_type is None:
+            item_type = self.get_item_type(item_code)
+        item = self._parse_item(item_data, item_code, item_type, lang)
+        return self.cache.put(key, item)
+
+    def parse_many(
+        self,
+        records: Sequence[bytes],
+        lang: str,
+        item_codes: Optional[Sequence[int]] = None,
+        item_types: Optional[Sequence[int]] = None,
+    ) -> List[Item]:
+        """Decode many records, running one batch handler per item type"""
+        if item_codes is None:
+            item_codes = [binary_array_to_int(record[:3]) for record in records]
+        if item_types is None:
+            item_types = [self.get_item_type(item_code) for item_code in item_codes]
+
+        items: List[Optional[Item]] = [None] * len(records)
+        # Cache misses grouped by type, then by key so repeats decode once
+        pending: Dict[int, Dict[Tuple, List[int]]] = {}
+        for position, record in enumerate(records):
+            key = self.cache_key(record, lang)
+            item = self.cache.get(key)
+            if item is not None:
+                items[position] = item
+            else:
+                pending.setdefault(item_types[position], {}).setdefault(key, []).append(
+                    position
+                )
+
+        for item_type, keys in pending.items():
+            positions = [key_positions[0] for key_positions in keys.values()]
+            batch_handler = self.batch_handlers.get(item_type)
+            if batch_handler is not None:
+                decoded = batch_handler(
+                    [item_codes[position] for position in positions],
+                    [records[position] for position in positions],
+                )
+            else:
+                decoded = [
+                    self._parse_item(
+                        records[position], item_codes[position], item_type, lang
+                    )
+                    for position in positions
+                ]
+            for (key, key_positions), item in zip(keys.items(), decoded):
+                item = self.cache.put(key, item)
+                for position in key_positions:
+                    items[position] = item
+
+        return items
+
+    def cache_key(self, item_data: bytes, lang: str) -> Tuple:
+        # Decoded items depend only on the raw record, the item names and the prices
+        return (
+            bytes(item_data),
+            self.config.LANG,
+            lang,
+            self.price_guide.version,
+        )
 
-    def parse(self, item_data: bytes, item_code: int, lang: str) -> Item:
-        item_type = self.get_item_type(item_code)
-        return self._parse_item(item_data, item_code, item_type, lang)
+    def get_prices(self, kind: str, *args) -> Dict[str, Any]:
+        return price_item(self.price_guide, kind, *args)
 
     def get_item_type(self, item_code: int) -> int:
+        if item_code < self.config.ITEM_TYPE_TABLE_SIZE:
+            return self.item_type_table[item_code]
+        # Every range lies inside the table, only the S-rank check on the low
+        # 16 bits can match past it
         if self.is_s_rank_weapon(item_code):
             return self.config.ItemType.SRANK_WEAPON
-        elif self.is_weapon(item_code):
-            return self.config.ItemType.WEAPON
-        elif self.is_frame(item_code):
-            return self.config.ItemType.FRAME
-        elif self.is_barrier(item_code):
-            return self.config.ItemType.BARRIER
-        elif self.is_unit(item_code):
-            return self.config.ItemType.UNIT
-        elif self.is_mag(item_code):
-            return self.config.ItemType.MAG
-        elif self.is_disk(item_code):
-            return self.config.ItemType.DISK
-        elif self.is_tool(item_code):
-            return self.config.ItemType.TOOL
-        else:
-            return self.config.ItemType.OTHER
+        return self.config.ItemType.OTHER
 
     def is_s_rank_weapon(self, item_code: int) -> bool:
         return item_code & 0xFFF0 in self.config.SRANK_WEAPON_CODES
@@ -85,35 +224,43 @@ class ItemParser:
     def _parse_item(
         self, item_data: bytes, item_code: int, item_type: int, lang: str
     ) -> Item:
-        if item_type == self.config.ItemType.SRANK_WEAPON:
-            return self.s_rank_weapon(item_code, item_data)
-        elif item_type == self.config.ItemType.WEAPON:
-            return self.weapon(item_code, item_data)
-        elif item_type == self.config.ItemType.FRAME:
-            return self.frame(item_code, item_data)
-        elif item_type == self.config.ItemType.BARRIER:
-            return self.barrier(item_code, item_data)
-        elif item_type == self.config.ItemType.UNIT:
-            return self.unit(item_code, item_data)
-        elif item_type == self.config.ItemType.MAG:
-            return self.mag(item_code, item_data)
-        elif item_type == self.config.ItemType.DISK:
-            return self.disk(item_code, item_data)
-        elif item_type == self.config.ItemType.TOOL:
-            return self.tool(item_code, item_data)
-        elif item_type == self.config.ItemType.OTHER:
-            return self.other(item_code, item_data)
-        else:
+        handler = self.handlers.get(item_type)
+        if handler is None:
             return f"unknown. ({int_to_hex(item_code)}). There's a possibility that New Ephinea Item"
+        return handler(item_code, item_data)
 
     def weapon(self, item_code: int, item_data: List[int]) -> Dict:
+        attributes = (
+            self.get_native(item_data),
+            self.get_a_beast(item_data),
+            self.get_machine(item_data),
+            self.get_dark(item_data),
+            self.get_hit(item_data),
+        )
+        return self._weapon(item_code, item_data, attributes, {})
+
+    def weapons(
+        self, item_codes: Sequence[int], records: Sequence[bytes]
+    ) -> List[Dict]:
+        """Decode many weapons, extracting attributes and pricing them together"""
+        attributes = self.get_attributes_many(records)
+        # Weapons with identical pricing inputs are only priced once
+        priced: Dict[Tuple, Dict[str, Any]] = {}
+        return [
+            self._weapon(item_code, item_data, attribute, priced)
+            for item_code, item_data, attribute in zip(item_codes, records, attributes)
+        ]
+
+    def _weapon(
+        self,
+        item_code: int,
+        item_data: List[int],
+        attributes: Tuple[int, int, int, int, int],
+        priced: Dict[Tuple, Dict[str, Any]],
+    ) -> Dict:
         name = self.get_item_name(item_code)
         grinder = item_data[3]
-        native = self.get_native(item_data)
-        a_beast = self.get_a_beast(item_data)
-        machine = self.get_machine(item_data)
-        dark = self.get_dark(item_data)
-        hit = self.get_hit(item_data)
+        native, a_beast, machine, dark, hit = attributes
         is_common = self.is_common_weapon(item_code)
 
         # Set element for common weapons if it exists
@@ -136,13 +283,21 @@ class ItemParser:
             "D": dark,
         }
 
-        price = self.price_guide.get_price_weapon(
-            name, weapon_attributes, hit, grinder, element
-        )
+        price_key = (name, attributes, grinder, element)
+        if price_key not in priced:
+            priced[price_key] = self.get_prices(
+                "weapon",
+                name,
+                weapon_attributes,
+                hit,
+                grinder,
+                element,
+            )
 
         return {
             "name": name,
             "type": 1,
+            "price_name": name,
             "itemdata": binary_array_to_hex(item_data),
             "element": element,
             "grinder": grinder,
@@ -156,7 +311,7 @@ class ItemParser:
             "tekked": tekked_mode,
             "rare": not is_common,
             "display": f"{tekked_text}{name}{self.grinder_label(grinder)}{element} [{native}/{a_beast}/{machine}/{dark}|{hit}]",
-            "price": price,
+            **priced[price_key],
         }
 
     def frame(self, item_code: int, item_data: List[int]) -> Dict:
@@ -173,11 +328,12 @@ class ItemParser:
 
         addition = {defense: defense, avoid: avoid}
         max_addition = {defense: defense_max_addition, avoid: avoid_max_addition}
-        price = self.price_guide.get_price_frame(name, addition, max_addition, slot)
+        priced = self.get_prices("frame", name, addition, max_addition, slot)
 
         return {
             "name": name,
             "type": 2,
+            "price_name": name,
             "itemdata": binary_array_to_hex(item_data),
             "slot": slot,
             "status": {
@@ -187,7 +343,7 @@ class ItemParser:
             "addition": addition,
             "max_addition": max_addition,
             "display": f"{name} [{defense}/{defense_max_addition}|{avoid}/{avoid_max_addition}] [{slot}S]",
-            "price": price,
+            **priced,
         }
 
     def barrier(self, item_code: int, item_data: List[int]) -> Dict:
@@ -203,47 +359,69 @@ class ItemParser:
         addition = {defense: defense_max_addition, avoid: avoid_max_addition}
         max_addition = {defense: defense_max_addition, avoid: avoid_max_addition}
 
-        price = self.price_guide.get_price_barrier(name, addition, max_addition)
+        priced = self.get_prices("barrier", name, addition, max_addition)
 
         return {
             "name": name,
             "type": 3,
+            "price_name": name,
             "itemdata": binary_array_to_hex(item_data),
             "addition": addition,
             "max_addition": max_addition,
             "display": f"{name} [{defense}/{defense_max_addition}|{avoid}/{avoid_max_addition}]",
-            "price": price,
+            **priced,
         }
 
     def unit(self, item_code: int, item_data: List[int]) -> Dict:
         name = self.get_item_name(item_code)
-        price = self.price_guide.get_price_unit(name, item_data)
+        priced = self.get_prices("unit", name)
 
         return {
             "name": name,
             "type": 4,
+            "price_name": name,
             "display": name,
             "itemdata": binary_array_to_hex(item_data),
-            "price": price,
+            **priced,
         }
 
     def mag(self, item_code: int, item_data: List[int]) -> Dict:
+        return self._mag(item_code, item_data, self.get_mag_fields(item_data), {})
+
+    def mags(self, item_codes: Sequence[int], records: Sequence[bytes]) -> List[Dict]:
+        """Decode many mags, reading their fields and pricing them together"""
+        fields = self.get_mag_fields_many(records)
+        # Mags with the same name and level are only priced once
+        priced: Dict[Tuple, Dict[str, Any]] = {}
+        return [
+            self._mag(item_code, item_data, mag_fields, priced)
+            for item_code, item_data, mag_fields in zip(item_codes, records, fields)
+        ]
+
+    def _mag(
+        self,
+        item_code: int,
+        item_data: List[int],
+        fields: Tuple[int, ...],
+        priced: Dict[Tuple, Dict[str, Any]],
+    ) -> Dict:
         name = self.get_item_name(item_code & 0xFFFF00)
-        level = item_data[2]
-        sync = item_data[16]
-        iq = item_data[17]
-        color = self.config.MAG_COLOR_CODES[item_data[19]]
-        defense = (item_data[5] << 8 | item_data[4]) / 100
-        pow = (item_data[7] << 8 | item_data[6]) / 100
-        dex = (item_data[9] << 8 | item_data[8]) / 100
-        mind = (item_data[11] << 8 | item_data[10]) / 100
+        level, sync, iq, color_code, defense, pow, dex, mind = fields
+        color = self.config.MAG_COLOR_CODES[color_code]
+        defense /= 100
+        pow /= 100
+        dex /= 100
+        mind /= 100
         # pbsの要素は0=center, 1=right、2=left
         pbs = self.get_pbs(binary_array_to_hex([item_data[3], item_data[18]]))
-        price = self.price_guide.get_price_mag(name, item_data, level)
+        price_key = (name, level)
+        if price_key not in priced:
+            priced[price_key] = self.get_prices("mag", name, level)
 
         return {
             "name": f"{name} LV{level} [{color[1]}]",
             "type": 5,
+            "price_name": name,
             "itemdata": binary_array_to_hex(item_data),
             "level": level,
             "sync": sync,
@@ -264,42 +442,76 @@ class ItemParser:
             "display": f"{name} LV{level} [{color[1]}] [{defense}/{pow}/{dex}/{mind}] [{pbs[2]}|{pbs[0]}|{pbs[1]}]",
             "display_front": f"{name} LV{level} [{color[1]}]",
             "display_end": f"] [{defense}/{pow}/{dex}/{mind}] [{pbs[2]}|{pbs[0]}|{pbs[1]}]",
-            "price": price,
+            **priced[price_key],
         }
 
     def disk(self, item_code: int, item_data: List[int]) -> Dict:
-        name = self.config.DISK_NAME_CODES[item_data[4]]
-        level = item_data[2] + 1
-        price = self.price_guide.get_price_disk(name, item_data, level)
+        return self._disk(item_data, (item_data[2] + 1, item_data[4]), {})
+
+    def disks(self, item_codes: Sequence[int], records: Sequence[bytes]) -> List[Dict]:
+        """Decode many disks, reading their levels and names together"""
+        if np is None:
+            fields = [(item_data[2] + 1, item_data[4]) for item_data in records]
+        else:
+            data = self.records_matrix(records, 5)
+            # Widened first, level byte 0xFF is level 256
+            levels = data[:, 2].astype(np.int64) + 1
+            fields = list(zip(levels.tolist(), data[:, 4].tolist()))
+        # Disks with the same name and level are only priced once
+        priced: Dict[Tuple, Dict[str, Any]] = {}
+        return [
+            self._disk(item_data, disk_fields, priced)
+            for item_data, disk_fields in zip(records, fields)
+        ]
+
+    def _disk(
+        self,
+        item_data: List[int],
+        fields: Tuple[int, int],
+        priced: Dict[Tuple, Dict[str, Any]],
+    ) -> Dict:
+        level, name_code = fields
+        name = self.config.DISK_NAME_CODES[name_code]
+        price_key = (name, level)
+        if price_key not in priced:
+            priced[price_key] = self.get_prices("disk", name, level)
 
         display_text = f"{name} LV{level} {self.config.DISK_NAME_LANGUAGE}"
 
         return {
             "name": display_text,
             "type": 6,
+            "price_name": name,
             "itemdata": binary_array_to_hex(item_data),
             "level": level,
             "display": display_text,
-            "price": price,
+            **priced[price_key],
         }
 
     def s_rank_weapon(self, item_code: int, item_data: List[int]) -> Dict:
         custom_name = self.get_custom_name(item_data[6:12])
-        name = f"S-RANK {custom_name} {self.config.S_RANK_WEAPON_CODES[item_code & 0xFFFF00]}"
+        weapon_type = self.config.SRANK_WEAPON_CODES[item_code & 0xFFFF00]
+        name = f"S-RANK {custom_name} {weapon_type}"
         grinder = item_data[3]
         element = self.get_srank_element(item_data)
-        price = self.price_guide.get_price_s_rank_weapon(
-            name, item_data, grinder, element
+        price_name = f"ES {weapon_type}"
+        priced = self.get_prices(
+            "srank_weapon",
+            price_name,
+            "",
+            grinder,
+            element,
         )
 
         return {
             "name": name,
             "type": 8,
+            "price_name": price_name,
             "itemdata": binary_array_to_hex(item_data),
             "grinder": grinder,
             "element": element,
             "display": f"{name} {self.grinder_label(grinder)} [{element}]",
-            "price": price,
+            **priced,
         }
 
     def tool(self, item_code: int, item_data: List[int]) -> Dict:
@@ -308,15 +520,16 @@ class ItemParser:
         # Set number based on data length (28 for inventory, otherwise storage)
         number = item_data[5] if len(item_data) == 28 else item_data[20]
 
-        price = self.price_guide.get_price_tool(name, item_data, number)
+        priced = self.get_prices("tool", name, number)
 
         return {
             "name": name,
             "type": 7,
+            "price_name": name,
             "itemdata": binary_array_to_hex(item_data),
             "number": number,
             "display": f"{name}{self.number_label(number)}",
-            "price": price,
+            **priced,
         }
 
     def other(self, item_code: int, item_data: List[int]) -> Dict:
@@ -325,15 +538,16 @@ class ItemParser:
         # Set number based on data length (28 for inventory, otherwise storage)
         number = item_data[5] if len(item_data) == 28 else item_data[20]
 
-        price = self.price_guide.get_price_other(name, item_data, number)
+        priced = self.get_prices("other", name, number)
 
         return {
             "name": name,
             "type": 9,
+            "price_name": name,
             "itemdata": binary_array_to_hex(item_data),
             "number": number,
             "display": f"{name}{self.number_label(number)}",
-            "price": price,
+            **priced,
         }
 
     def get_item_name(self, item_code: int) -> str:
@@ -382,6 +596,71 @@ class ItemParser:
 
         return 0
 
+    def get_attributes_many(
+        self, records: Sequence[bytes]
+    ) -> List[Tuple[int, int, int, int, int]]:
+        """(native, a_beast, machine, dark, hit) of many weapon records at once"""
+        attribute_types = [
+            self.config.AttributeType.NATIVE,
+            self.config.AttributeType.A_BEAST,
+            self.config.AttributeType.MACHINE,
+            self.config.AttributeType.DARK,
+            self.config.AttributeType.HIT,
+        ]
+        if np is None:
+            return [
+                tuple(
+                    self.get_attribute(attribute_type, item_data)
+                    for attribute_type in attribute_types
+                )
+                for item_data in records
+            ]
+
+        # (N, 3, 2) array of the (attribute type, value) pairs in bytes 6-12
+        pairs = self.records_matrix(records, 12)[:, 6:].reshape(len(records), 3, 2)
+        rows = np.arange(len(records))
+        columns = []
+        for attribute_type in attribute_types:
+            # get_attribute returns the first matching pair
+            matches = pairs[:, :, 0] == attribute_type
+            first = matches.argmax(axis=1)
+            columns.append(np.where(matches.any(axis=1), pairs[rows, first, 1], 0))
+        return [tuple(row) for row in np.stack(columns, axis=1).tolist()]
+
+    def get_mag_fields(self, item_data: List[int]) -> Tuple[int, ...]:
+        """(level, sync, iq, color, def, pow, dex, mind) of a mag, stats x100"""
+        return (
+            item_data[2],
+            item_data[16],
+            item_data[17],
+            item_data[19],
+            item_data[5] << 8 | item_data[4],
+            item_data[7] << 8 | item_data[6],
+            item_data[9] << 8 | item_data[8],
+            item_data[11] << 8 | item_data[10],
+        )
+
+    def get_mag_fields_many(self, records: Sequence[bytes]) -> List[Tuple[int, ...]]:
+        """get_mag_fields of many mag records at once"""
+        if np is None:
+            return [self.get_mag_fields(item_data) for item_data in records]
+
+        data = self.records_matrix(records, 20)
+        # Stats are little-endian 16 bit values in bytes 4-11
+        stats = data[:, 4:12].astype(np.uint16)
+        stats = stats[:, 1::2] << 8 | stats[:, 0::2]
+        columns = np.column_stack(
+            (data[:, 2], data[:, 16], data[:, 17], data[:, 19], stats)
+        )
+        return [tuple(row) for row in columns.tolist()]
+
+    @staticmethod
+    def records_matrix(records: Sequence[bytes], width: int) -> "np.ndarray":
+        """(N, width) array of the first width bytes of every record"""
+        return np.frombuffer(
+            b"".join(item_data[:width] for item_data in records), dtype=np.uint8
+        ).reshape(len(records), width)
+
     def get_addition(self, name: str, additions: Dict, type_: int) -> Union[int, str]:
         if name in additions:
             return additions[name][type_]
@@ -412,13 +691,14 @@ class ItemParser:
         # Create temp array for name storage
         temp = []
 
-        # Second character (effectively first) is lowercase data, convert to uppercase
-        custom_name_data[0] -= 0x04
+        # Second character (effectively first) is lowercase data, convert to uppercase.
+        # The record is read-only, so the adjusted byte is passed on separately.
+        first = (custom_name_data[0] - 0x04) & 0xFF
 
         # Get 3 letters * 3 times, but first character is empty so effectively 8 characters
-        temp.extend(self.three_letters(custom_name_data[0:2]))
-        temp.extend(self.three_letters(custom_name_data[2:4]))
-        temp.extend(self.three_letters(custom_name_data[4:6]))
+        temp.extend(self.three_letters(first, custom_name_data[1]))
+        temp.extend(self.three_letters(custom_name_data[2], custom_name_data[3]))
+        temp.extend(self.three_letters(custom_name_data[4], custom_name_data[5]))
 
         # Convert each number to corresponding letter
         # 1 -> A, 26 -> Z, 0 is skipped
@@ -429,11 +709,11 @@ class ItemParser:
 
         return custom_name
 
-    def three_letters(self, array):
+    def three_letters(self, high, low):
         # Remove initial data not related to calculation
-        array[0] = array[0] - 0x80
-        first = array[0] // 0x04
-        second = ((array[0] % 0x04) << 8 | array[1]) // 0x20
-        third = array[1] % 0x20
+        high = (high - 0x80) & 0xFF
+        first = high // 0x04
+        second = ((high % 0x04) << 8 | low) // 0x20
+        third = low % 0x20
 
         return [first, second, third]
@@ -1,33 +1,63 @@
 import json
-from typing import List, Dict, Any
+import logging
+import re
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 from greedles.model.character import Character
 from greedles.model.bank import Bank
 from greedles.model.config.config import Config
+from greedles.model.serializer import dump_model, load_model
 from greedles.parser.bank_parser import BankParser
 from greedles.parser.character_parser import CharacterParser
 from greedles.parser.item_parser import ItemParser
+from greedles.parser.result_cache import ResultCache, content_digest, content_key
+from greedles.price_guide.price_guide import (
+    PRICE_GUIDE_DIRECTORY,
+    PriceGuideAbstract,
+    PriceGuideFixed,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class Parsers:
     """
     Parsers for different types of data
-    """
 
-    bank_parser: BankParser
-    character_parser: CharacterParser
-    item_parser: ItemParser
+    The parsers keep no per-file state, so one set can be built up front and
+    shared by every InputHandler using the same config and price guide.
+    """
 
-    @classmethod
-    def configure(cls, config: Config):
-        cls.bank_parser = BankParser(config)
-        cls.character_parser = CharacterParser(config)
-        cls.item_parser = ItemParser(config)
+    def __init__(
+        self, config: Config, price_guide: PriceGuideAbstract, lazy: bool = False
+    ):
+        self.config = config
+        self.price_guide = price_guide
+        self.lazy = lazy
+        self.bank_parser = BankParser(config, price_guide, lazy)
+        self.character_parser = CharacterParser(config, price_guide, lazy)
+        self.item_parser = ItemParser(config, price_guide)
 
 
 class InputHandler:
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        price_guide: Optional[PriceGuideAbstract] = None,
+        lazy: bool = False,
+        parsers: Optional[Parsers] = None,
+        result_cache: Optional[ResultCache] = None,
+    ):
         self.config = config
-        Parsers.configure(config)
+        if parsers is None:
+            if price_guide is None:
+                price_guide = PriceGuideFixed(PRICE_GUIDE_DIRECTORY)
+            # Keep raw item records and decode items only when they are read
+            parsers = Parsers(config, price_guide, lazy)
+        self.parsers = parsers
+        self.price_guide = parsers.price_guide
+        self.lazy = parsers.lazy
+        # Decoded files by content, price guide version and language
+        self.result_cache = result_cache
 
         self.characters = []
         self.share_banks = []
@@ -42,15 +72,17 @@ class InputHandler:
 
             # Create file-like objects from bytes for sorting
             class BytesFile:
-                def __init__(self, name: str, content: bytes):
+                def __init__(self, name: str, content: memoryview):
                     self.name = name
                     self.content = content
 
-                def read(self):
+                def read(self) -> memoryview:
                     return self.content
 
+            # Every later stage slices views of these buffers rather than copying
             byte_files = [
-                BytesFile(f"psochar{i}.dat", file) for i, file in enumerate(files)
+                BytesFile(f"psochar{i}.dat", memoryview(file))
+                for i, file in enumerate(files)
             ]
             sorted_files = self.sort_input_files(byte_files)
 
@@ -76,7 +108,7 @@ class InputHandler:
             self.decode_and_display(file_data)
 
         except Exception as e:
-            print(f"Error processing files: {str(e)}")
+            logger.error(f"Error processing files: {str(e)}")
             raise
 
     def decode_and_display(self, file_data: List[Dict[str, Any]]) -> None:
@@ -111,6 +143,21 @@ class InputHandler:
         if not file_data:
             return
 
+        for _ in self.decode_stream(
+            (file_info["filename"], file_info["binary"]) for file_info in file_data
+        ):
+            pass
+
+    def decode_stream(
+        self, files: Iterable[Tuple[str, bytes]]
+    ) -> Iterator[Union[Character, Bank]]:
+        """
+        Decode (filename, binary) pairs one at a time
+
+        Each character or share bank is yielded as soon as it is decoded, so files
+        can be fed straight from an archive as they are decompressed. all_items
+        and the global variables are set once the input is exhausted.
+        """
         characters = []
         share_banks = []
         all_items = [
@@ -126,58 +173,25 @@ class InputHandler:
             },
         ]
 
-        for file_info in file_data:
-            binary = file_info["binary"]
-            filename = file_info["filename"]
-
-            # Decode share bank file
-            if "psobank" in filename.lower() and "classic" not in filename.lower():
-                bank_parser = BankParser(self.config)
-                share_bank = bank_parser.parse(binary, Config.Mode.NORMAL)
-                share_banks.append(share_bank)
-                all_items[share_bank.mode]["Inventory"]["EN"].extend(
-                    share_bank.bank["EN"]
-                )
-                all_items[share_bank.mode]["Inventory"]["JA"].extend(
-                    share_bank.bank["JA"]
-                )
+        for filename, binary in files:
+            model = self.decode_file(filename, binary)
+            if model is None:
                 continue
 
-            # Decode classic bank file
-            if "psoclassicbank" in filename.lower():
-                bank_parser = BankParser(self.config)
-                classic_bank = bank_parser.parse(binary, Config.Mode.CLASSIC)
-                share_banks.append(classic_bank)
-                all_items[classic_bank.mode]["Inventory"]["EN"].extend(
-                    classic_bank.bank["EN"]
-                )
-                all_items[classic_bank.mode]["Inventory"]["JA"].extend(
-                    classic_bank.bank["JA"]
-                )
-                continue
-
-            # Decode character file
-            if "psochar" in filename.lower():
-                import re
+            # Parsers decode the EN item names
+            items = all_items[model.mode]["Inventory"]["EN"]
+            if isinstance(model, Character):
+                characters.append(model)
+                items.extend(model.inventory.inventory)
+                items.extend(model.bank.inventory.inventory)
+            else:
+                share_banks.append(model)
+                items.extend(model.inventory.inventory)
 
-                slot = int(re.search(r"(\d+)\.", filename).group(1))
-                character_parser = CharacterParser(self.config)
-                character = character_parser.parse(binary, slot + 1)
-                characters.append(character)
+            yield model
 
-                # Add character items to all_items
-                all_items[character.mode]["Inventory"]["EN"].extend(
-                    character.inventory["EN"]
-                )
-                all_items[character.mode]["Inventory"]["EN"].extend(
-                    character.bank["EN"]
-                )
-                all_items[character.mode]["Inventory"]["JA"].extend(
-                    character.inventory["JA"]
-                )
-                all_items[character.mode]["Inventory"]["JA"].extend(
-                    character.bank["JA"]
-                )
+        if not characters and not share_banks:
+            return
 
         # Sort items and add indices
         for items in all_items:
@@ -186,44 +200,108 @@ class InputHandler:
                 for idx, item in enumerate(items["Inventory"][lang]):
                     item.append(idx)
 
+        characters.sort(key=lambda character: character.slot)
+        share_banks.sort(key=lambda share_bank: share_bank.mode)
+
         # Set global variables
         self.set_global_variables(characters, share_banks, all_items)
 
+    def decode_file(
+        self, filename: str, binary: bytes
+    ) -> Optional[Union[Character, Bank]]:
+        """
+        Decode a single character or share bank file, None for other files
+
+        With a result cache, files already decoded against the same price guide
+        are rebuilt from their cached JSON instead. Files are keyed on what
+        their name decodes them as and their content, so the same file in
+        another folder of an archive is still found. Every call returns its
+        own copy, so the entries decode_stream indexes are never shared
+        between handlers.
+        """
+        kind = self.save_file_kind(filename)
+        if kind is None:
+            return None
+        if self.result_cache is None:
+            return self.parse_file(kind, binary)
+
+        key = content_key(
+            "model",
+            *(str(part) for part in kind),
+            content_digest(binary),
+            self.config.LANG,
+            self.price_guide.version or "",
+        )
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            return load_model(cached)
+        model = self.parse_file(kind, binary)
+        self.result_cache.put(key, dump_model(model))
+        return model
+
+    @staticmethod
+    def save_file_kind(filename: str) -> Optional[Tuple[str, int]]:
+        """("bank", mode) or ("character", slot) of a save file, None otherwise"""
+        filename = filename.lower()
+        if "psobank" in filename and "classic" not in filename:
+            return ("bank", Config.Mode.NORMAL)
+        if "psoclassicbank" in filename:
+            return ("bank", Config.Mode.CLASSIC)
+        if "psochar" in filename:
+            return ("character", InputHandler.character_slot(filename) + 1)
+        return None
+
+    def parse_file(
+        self, kind: Tuple[str, int], binary: bytes
+    ) -> Union[Character, Bank]:
+        """Decode a file of a save_file_kind"""
+        file_type, number = kind
+        if file_type == "bank":
+            return self.parsers.bank_parser.parse_share_bank(binary, number)
+        return self.parsers.character_parser.parse(binary, number)
+
+    @staticmethod
+    def sort_inventory(inventory: List[List[Any]]) -> List[List[Any]]:
+        """Sort inventory entries by item code, meseta sorts last"""
+        return sorted(inventory, key=lambda entry: entry[0])
+
     @staticmethod
     def sort_input_files(files: List[Any]) -> List[Any]:
-        def sort_key(file):
-            filename = file.name.lower()
-            if "psoclassicbank" in filename:
-                return (2, 0)  # Sort classic bank files last
-            if "psobank" in filename:
-                return (1, 0)  # Sort regular bank files second-to-last
+        return sorted(
+            files, key=lambda file: InputHandler.input_file_sort_key(file.name)
+        )
 
-            # Extract slot number for character files
-            import re
+    @staticmethod
+    def input_file_sort_key(filename: str) -> Tuple[int, int]:
+        filename = filename.lower()
+        if "psoclassicbank" in filename:
+            return (2, 0)  # Sort classic bank files last
+        if "psobank" in filename:
+            return (1, 0)  # Sort regular bank files second-to-last
 
-            match = re.search(r"\s*(\d+)\.", filename)
-            slot_num = int(match.group(1)) if match else 0
-            return (0, slot_num)  # Sort character files by slot number
+        # Sort character files by slot number
+        return (0, InputHandler.character_slot(filename))
 
-        return sorted(files, key=sort_key)
+    @staticmethod
+    def character_slot(filename: str) -> int:
+        """Slot number in a character file name, 0 for names without one"""
+        match = re.search(r"(\d+)\.", filename)
+        return int(match.group(1)) if match else 0
 
     def set_global_variables(self, characters, share_banks, all_items):
         if characters:
             self.characters = characters
-            print("===== characters =====")
-            print(characters)
+            logger.debug("characters: %s", characters)
             self.set_mode_data("characters", characters)
 
         if share_banks:
             self.share_banks = share_banks
-            print("===== shareBanks =====")
-            print(share_banks)
+            logger.debug("shareBanks: %s", share_banks)
             self.set_mode_data("shareBanks", share_banks)
 
         if all_items:
             self.all_items = all_items
-            print("===== allItems =====")
-            print(all_items)
+            logger.debug("allItems: %s", all_items)
             self.set_mode_data("allItems", all_items)
 
     def set_mode_data(self, type_name: str, models: List[Any]) -> None:
@@ -231,7 +309,12 @@ class InputHandler:
         classics = []
 
         for model in models:
-            if model is not None and model.mode == Config.Mode.NORMAL:
+            # all_items entries are dicts, characters and banks are models
+            if isinstance(model, dict):
+                mode = model["Mode"]
+            else:
+                mode = getattr(model, "mode", None)
+            if mode == Config.Mode.NORMAL:
                 normals.append(model)
             else:
                 classics.append(model)
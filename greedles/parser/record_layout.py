@@ -0,0 +1,149 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import struct
+
+
+def decode_utf16(array: bytes) -> str:
+    """Decode a NUL terminated UTF-16LE string"""
+    return bytes(array).decode("utf-16-le", errors="surrogatepass").split("\x00", 1)[0]
+
+
+def count_stages(array: bytes) -> int:
+    """Count the leading non-zero 4-byte stage records"""
+    count = 0
+    for i in range(0, len(array), 4):
+        if not any(array[i : i + 4]):
+            break
+        count += 1
+    return count
+
+
+# Codec name -> (struct format, decoder applied to the unpacked value)
+CODECS: Dict[str, Tuple[str, Optional[Callable[[Any], Any]]]] = {
+    "u8": ("B", None),
+    "u16": ("H", None),
+    "u32": ("I", None),
+    "bytes": ("{width}s", None),
+    "utf16": ("{width}s", decode_utf16),
+    "stages": ("{width}s", count_stages),
+}
+
+
+class Field:
+    """A fixed-width value at a fixed offset of a record"""
+
+    def __init__(self, name: str, offset: int, width: int, codec: str = "bytes"):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec {codec} for field {name}")
+        self.name = name
+        self.offset = offset
+        self.width = width
+        self.codec = codec
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.width
+
+
+class Region:
+    """A block of the record handed on to another parser, e.g. an item area"""
+
+    def __init__(self, name: str, offset: int, width: Optional[int] = None):
+        self.name = name
+        self.offset = offset
+        # None runs the region to the end of the data
+        self.width = width
+
+
+class RecordLayout:
+    """
+    Declarative description of a binary record
+
+    Fields are compiled once into a single struct.Struct, so decoding every
+    header field of a file is one unpack_from call. Regions may overlap each
+    other and the fields; they are returned as slices of the input.
+    """
+
+    def __init__(
+        self, name: str, fields: List[Field], regions: Optional[List[Region]] = None
+    ):
+        self.name = name
+        self.fields = sorted(fields, key=lambda field: field.offset)
+        self.regions = list(regions or [])
+
+        fmt = "<"
+        position = 0
+        decoders = []
+        for field in self.fields:
+            if field.offset < position:
+                raise ValueError(f"Field {field.name} overlaps in layout {name}")
+            code, decoder = CODECS[field.codec]
+            code = code.format(width=field.width)
+            if struct.calcsize("<" + code) != field.width:
+                raise ValueError(
+                    f"Field {field.name} width {field.width} does not fit codec {field.codec}"
+                )
+            fmt += f"{field.offset - position}x" if field.offset > position else ""
+            fmt += code
+            position = field.end
+            decoders.append(decoder)
+
+        self.struct = struct.Struct(fmt)
+        self.names = tuple(field.name for field in self.fields)
+        self.decoders = tuple(decoders)
+
+    @property
+    def size(self) -> int:
+        return self.struct.size
+
+    def unpack(self, data: bytes) -> Dict[str, Any]:
+        """Decode every field of the layout from data"""
+        values = self.struct.unpack_from(data)
+        return {
+            name: decoder(value) if decoder else value
+            for name, decoder, value in zip(self.names, self.decoders, values)
+        }
+
+    def slice_regions(self, data: bytes) -> Dict[str, bytes]:
+        """Cut every region of the layout out of data"""
+        return {
+            region.name: (
+                data[region.offset :]
+                if region.width is None
+                else data[region.offset : region.offset + region.width]
+            )
+            for region in self.regions
+        }
+
+
+CHARACTER_LAYOUT = RecordLayout(
+    "psochar",
+    [
+        # Inventory header: item count, HP and TP materials, language
+        Field("inventory_item_count", 4, 1, "u8"),
+        Field("mode", 7, 1, "u8"),
+        Field("level", 876, 1, "u8"),
+        Field("experience", 877, 7),
+        Field("guild_card_number", 888, 8, "utf16"),
+        Field("section_id", 936, 1, "u8"),
+        Field("character_class", 937, 1, "u8"),
+        Field("name", 968, 20, "utf16"),
+        # Bank header: item count, meseta
+        Field("bank_item_count", 1792, 4, "u32"),
+        Field("ep1_progress", 11460, 36, "stages"),
+        Field("ep2_progress", 11496, 24, "stages"),
+    ],
+    [
+        Region("inventory", 8, 4800),
+        Region("bank", 1800, 4800),
+    ],
+)
+
+# .psobank and .psoclassicbank share the same layout: the whole file is items.
+# There is no item-count header, so share banks are scanned slot by slot.
+SHARE_BANK_LAYOUT = RecordLayout(
+    "psobank",
+    [],
+    [
+        Region("bank", 0),
+    ],
+)
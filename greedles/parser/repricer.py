@@ -0,0 +1,65 @@
+from typing import Any, Dict, List, Mapping, Tuple, Union
+from greedles.model.bank import Bank
+from greedles.model.character import Character
+from greedles.model.inventory import Inventory
+from greedles.model.item import Item, LazyItem
+from greedles.parser.item_parser import price_item
+from greedles.price_guide.price_guide import PriceGuideAbstract
+
+
+class Repricer:
+    """
+    Refreshes the prices of decoded items after a price guide update
+
+    Items remember the get_prices_* call that priced them and the entries it
+    read (their "pricing" field), so only items that read an entry changed
+    between the two guides are priced again, and none are decoded again.
+    Lazy items that were never decoded are left alone, they are priced when
+    they are first read.
+    """
+
+    def __init__(self, previous: PriceGuideAbstract, price_guide: PriceGuideAbstract):
+        self.price_guide = price_guide
+        self.changed = price_guide.changed_entries(previous)
+        # Items are shared between inventories, each one is repriced once.
+        # id(item) -> (item, repriced item), holding item keeps its id unique
+        self.repriced: Dict[int, Tuple[Mapping, Mapping]] = {}
+
+    def is_stale(self, item: Mapping) -> bool:
+        pricing = item.get("pricing")
+        if not pricing:
+            return False
+        return any(
+            (category, name) in self.changed for category, name in pricing["sources"]
+        )
+
+    def reprice_item(self, item: Mapping) -> Mapping:
+        """The item with refreshed prices, or item itself if they did not change"""
+        if isinstance(item, LazyItem):
+            if not item.decoded or not self.is_stale(item.item):
+                return item
+        elif not self.is_stale(item):
+            return item
+        if id(item) in self.repriced:
+            return self.repriced[id(item)][1]
+
+        pricing = item["pricing"]
+        repriced = Item.freeze(
+            {**item, **price_item(self.price_guide, pricing["kind"], *pricing["args"])}
+        )
+        self.repriced[id(item)] = (item, repriced)
+        return repriced
+
+    def reprice_entries(self, entries: List[List[Any]]) -> None:
+        """Reprice [code, item, slot, ...] entries in place"""
+        for entry in entries:
+            entry[1] = self.reprice_item(entry[1])
+
+    def reprice_inventory(self, inventory: Inventory) -> None:
+        self.reprice_entries(inventory.inventory)
+
+    def reprice_model(self, model: Union[Character, Bank]) -> None:
+        """Reprice a decoded character, with its bank, or share bank"""
+        self.reprice_inventory(model.inventory)
+        if isinstance(model, Character):
+            self.reprice_inventory(model.bank.inventory)
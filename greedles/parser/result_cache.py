@@ -0,0 +1,217 @@
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple, Union
+import hashlib
+import logging
+import os
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# Suffix of the files of the disk tier
+RESULT_SUFFIX = ".result"
+
+
+def content_key(*parts: Union[str, bytes]) -> str:
+    """SHA-256 of the key parts, each length prefixed so parts never run together"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode()
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def content_digest(content: bytes) -> bytes:
+    return hashlib.sha256(content).digest()
+
+
+def is_private(directory: Path) -> bool:
+    """Whether directory is owned by this user and no other user can access it"""
+    if not hasattr(os, "getuid"):
+        # No POSIX owner and mode on Windows, its ACLs are left to the operator
+        return True
+    stat = directory.stat()
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o077
+
+
+class ResultCache:
+    """
+    Two tier cache of serialized decode results
+
+    Values are bytes keyed by content_key of the uploaded content, language
+    and price guide version, so a changed file or a new guide is simply a
+    miss. The memory tier is an LRU bounded to max_bytes. The disk tier in
+    directory is shared by every process using it: files are written
+    atomically, expire ttl seconds after they were written and the least
+    recently read are removed once they exceed max_disk_bytes. The directory
+    is created private to this user and the disk tier is disabled if another
+    user could write to it.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        ttl: float = 3600.0,
+    ):
+        self.directory = Path(directory) if directory is not None else None
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        # key -> (expiry time, value)
+        self.results: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self.size = 0
+        self.lock = Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.disk_size = 0
+        if self.directory is not None:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            if is_private(self.directory):
+                self.evict_disk()
+            else:
+                logger.warning(
+                    f"Not caching results in {self.directory}, it is not private "
+                    "to this user"
+                )
+                self.directory = None
+
+    def get(self, key: str) -> Optional[bytes]:
+        """A cached value, or None"""
+        now = time.time()
+        with self.lock:
+            cached = self.results.get(key)
+            if cached is not None:
+                expires, value = cached
+                if expires > now:
+                    self.results.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+
+        value, expires = self._read_disk(key, now)
+        with self.lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, value, expires)
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        expires = time.time() + self.ttl
+        with self.lock:
+            self._store(key, value, expires)
+        self._write_disk(key, value)
+
+    def clear(self) -> None:
+        """Drop the memory tier, the disk tier is left to expire"""
+        with self.lock:
+            self.results.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "entries": len(self.results),
+            "disk_size": self.disk_size,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _store(self, key: str, value: bytes, expires: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        if key in self.results:
+            self._remove(key)
+        self.results[key] = (expires, value)
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self.results)))
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, value = self.results.pop(key)
+        self.size -= len(value)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{RESULT_SUFFIX}"
+
+    def _read_disk(self, key: str, now: float) -> Tuple[Optional[bytes], float]:
+        if self.directory is None:
+            return None, 0.0
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            # The modification time is when the result was written
+            expires = stat.st_mtime + self.ttl
+            if expires <= now:
+                path.unlink(missing_ok=True)
+                return None, 0.0
+            value = path.read_bytes()
+            # The access time orders eviction, least recently read first
+            os.utime(path, (now, stat.st_mtime))
+        except FileNotFoundError:
+            return None, 0.0
+        except OSError as e:
+            logger.warning(f"Ignoring unreadable cached result {path}: {e}")
+            return None, 0.0
+        return value, expires
+
+    def _write_disk(self, key: str, value: bytes) -> None:
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(value)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not cache result {path}: {e}")
+            return
+
+        with self.lock:
+            self.disk_size += len(value)
+            full = self.disk_size > self.max_disk_bytes
+        if full:
+            self.evict_disk()
+
+    def evict_disk(self) -> None:
+        """Remove expired results, then the least recently read over max_disk_bytes"""
+        now = time.time()
+        files = []
+        for path in self.directory.glob(f"*{RESULT_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_mtime + self.ttl <= now:
+                path.unlink(missing_ok=True)
+                continue
+            files.append((stat.st_atime, stat.st_size, path))
+
+        files.sort()
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, path in files:
+            if size <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+            self.evictions += 1
+        with self.lock:
+            self.disk_size = size
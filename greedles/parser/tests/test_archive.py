@@ -0,0 +1,83 @@
+"""
+Test streaming ingestion of save file archives
+
+Archives are built in memory from synthetic character and share bank files and
+decoded one member at a time through InputHandler.decode_stream.
+"""
+
+import io
+import zipfile
+
+import pytest
+
+from greedles.model.bank import Bank
+from greedles.model.character import Character
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.parser.archive import is_save_file, iter_save_files
+from greedles.parser.parser import InputHandler
+from greedles.price_guide.price_guide import PRICE_GUIDE_DIRECTORY, PriceGuideFixed
+from greedles.tests.save_files import SHARE_BANK, character_file
+
+
+@pytest.fixture
+def archive():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("Ephinea/.psobank", SHARE_BANK)
+        zip_file.writestr("Ephinea/1.psochar", character_file("Second"))
+        zip_file.writestr("Ephinea/readme.txt", b"not a save file")
+        zip_file.writestr("Ephinea/0.psochar", character_file("First"))
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.fixture
+def input_handler():
+    return InputHandler(Config(ItemCodesEN()), PriceGuideFixed(PRICE_GUIDE_DIRECTORY))
+
+
+def test_is_save_file():
+    assert is_save_file("Ephinea/0.psochar")
+    assert is_save_file("Ephinea/.PSOBANK")
+    assert is_save_file("Ephinea/.psoclassicbank")
+    assert not is_save_file("Ephinea/readme.txt")
+
+
+def test_iter_save_files(archive):
+    names = [name for name, _ in iter_save_files(archive)]
+    assert names == ["Ephinea/.psobank", "Ephinea/1.psochar", "Ephinea/0.psochar"]
+
+    archive.seek(0)
+    sorted_names = [
+        name for name, _ in iter_save_files(archive, InputHandler.input_file_sort_key)
+    ]
+    assert sorted_names == [
+        "Ephinea/0.psochar",
+        "Ephinea/1.psochar",
+        "Ephinea/.psobank",
+    ]
+
+
+def test_decode_stream(archive, input_handler: InputHandler):
+    members = iter_save_files(archive, InputHandler.input_file_sort_key)
+    stream = input_handler.decode_stream(members)
+
+    # The first character is available before later members are inflated
+    first = next(stream)
+    assert isinstance(first, Character)
+    assert first.name == "First"
+    assert input_handler.characters == []
+
+    rest = list(stream)
+    assert [type(model) for model in rest] == [Character, Bank]
+    assert [character.name for character in input_handler.characters] == [
+        "First",
+        "Second",
+    ]
+    assert len(input_handler.share_banks) == 1
+
+    all_items = input_handler.all_items[Config.Mode.NORMAL]["Inventory"]["EN"]
+    assert [entry[-1] for entry in all_items] == list(range(len(all_items)))
+    assert [entry[1]["name"] for entry in all_items].count("Monomate") == 3
+    assert "characters" in input_handler.normals
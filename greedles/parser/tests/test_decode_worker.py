@@ -0,0 +1,131 @@
+"""
+Test decoding uploads the way the decoding processes do
+"""
+
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from greedles.model.config.config import Config
+from greedles.parser import decode_worker
+from greedles.tests.save_files import SHARE_BANK
+
+
+@pytest.fixture
+def worker(price_directory: Path):
+    decode_worker.init_worker(price_directory, price_directory.parent / "snapshot")
+    yield decode_worker
+    decode_worker._parsers = None
+    decode_worker._result_cache = None
+
+
+def monomate(result):
+    [item] = [
+        entry[1]
+        for entry in result["all_items"][0]["Inventory"]["EN"]
+        if entry[1]["type"] == Config.ItemType.TOOL
+    ]
+    return item
+
+
+def test_decode_archive(worker):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_file:
+        zip_file.writestr("Ephinea/.psobank", SHARE_BANK)
+        zip_file.writestr("Ephinea/notes.txt", b"skipped")
+
+    version = worker.worker_price_guide_version()
+    priced, payload = worker.decode_in_worker(
+        [("Ephinea.zip", buffer.getvalue())], version
+    )
+
+    assert priced == version
+
+    result = json.loads(payload)
+    assert len(result["share_banks"]) == 1
+    assert result["share_banks"][0]["mode"] == Config.Mode.NORMAL
+    item = monomate(result)
+    assert item["name"] == "Monomate"
+    assert item["number"] == 5
+
+
+def test_reload_price_guide(worker, price_directory: Path):
+    tools = json.loads((price_directory / "tools.json").read_text())
+    tools["Monomate"] = {"base": "2"}
+    (price_directory / "tools.json").write_text(json.dumps(tools))
+    old_version = worker.worker_price_guide_version()
+
+    # The server passes the version of the guide it swapped in
+    version, payload = worker.decode_in_worker([(".psobank", SHARE_BANK)], "new")
+
+    # The files were built, not the version the server named
+    assert version == worker.worker_price_guide_version() != old_version
+    item = monomate(json.loads(payload))
+    assert item["prices"] == [10, 10, 10]
+
+
+def test_reload_failure_keeps_price_guide(worker, price_directory: Path):
+    old_version = worker.worker_price_guide_version()
+    (price_directory / "tools.json").write_text("{half written")
+
+    version, payload = worker.decode_in_worker([(".psobank", SHARE_BANK)], "new")
+
+    assert version == old_version
+    assert monomate(json.loads(payload))["name"] == "Monomate"
+
+
+def test_encode_payload():
+    payload = {"mode": Config.Mode.CLASSIC, "prices": (1.0, 2.0, 3.0), 4: "slot"}
+
+    assert json.loads(decode_worker.encode_payload(payload)) == {
+        "mode": 1,
+        "prices": [1.0, 2.0, 3.0],
+        "4": "slot",
+    }
+
+
+def test_iter_records(worker):
+    records = worker.iter_records(
+        worker._parsers, [(".psobank", SHARE_BANK), ("0.psochar", b"short")]
+    )
+
+    # Each file is sent as soon as it is decoded
+    share_bank = json.loads(next(records))
+    assert share_bank["type"] == "share_bank"
+    assert share_bank["share_bank"]["mode"] == Config.Mode.NORMAL
+    error = json.loads(next(records))
+    assert error["type"] == "error"
+    assert list(records) == []
+
+
+def test_rollup_all_items():
+    def all_items(*codes):
+        return [
+            {
+                "Slot": "AllItems",
+                "Mode": Config.Mode.NORMAL,
+                "Inventory": {
+                    "JA": [],
+                    "EN": [[code, {}, 1, index] for index, code in enumerate(codes)],
+                },
+            },
+            {
+                "Slot": "AllItems(Classic)",
+                "Mode": Config.Mode.CLASSIC,
+                "Inventory": {"JA": [], "EN": []},
+            },
+        ]
+
+    rollup = decode_worker.rollup_all_items(
+        [("First", all_items("01", "03")), ("Second", all_items("02"))]
+    )
+
+    assert rollup[0]["Inventory"]["EN"] == [
+        ["01", {}, 1, "First", 0],
+        ["02", {}, 1, "Second", 1],
+        ["03", {}, 1, "First", 2],
+    ]
+    assert rollup[1]["Inventory"]["EN"] == []
@@ -0,0 +1,200 @@
+"""
+Test the inventory parser module
+
+Item regions are built from synthetic 28-byte records so that the batch (numpy)
+decoder can be checked against the record-by-record decoder.
+"""
+
+import pytest
+
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.parser.item_cache import ItemCache
+from greedles.parser.inventory_parser import InventoryParser
+from greedles.price_guide.price_guide import PRICE_GUIDE_DIRECTORY, PriceGuideFixed
+
+RECORD_LENGTH = 28
+
+
+def record(*data: int) -> bytes:
+    return bytes(data).ljust(RECORD_LENGTH, b"\x00")
+
+
+RECORDS = [
+    record(0x00, 0x01, 0x00, 0x02, 0x00, 0x00, 0x01, 0x14, 0x05, 0x1E),  # Saber +2
+    record(),  # Empty slot
+    record(0x01, 0x01, 0x00, 0x00, 0x00, 0x03, 0x02, 0x00, 0x01),  # Frame
+    record(0x03, 0x00, 0x00, 0x00, 0x00, 0x05),  # Monomate x5
+    record(0x00, 0xFF, *[0x00] * 10, 0xFF, 0xFF, 0xFF, 0xFF),  # Emptied slot
+    record(0x01, 0x03, 0x00),  # Unit
+    record(0x02, 0x00, 0x05, *[0x00] * 16, 0x01),  # Mag
+    record(0x03, 0x02, 0x0E, 0x00, 0x00),  # Disk
+]
+
+
+@pytest.fixture(scope="module")
+def config():
+    return Config(ItemCodesEN())
+
+
+@pytest.fixture(scope="module")
+def price_guide():
+    return PriceGuideFixed(PRICE_GUIDE_DIRECTORY)
+
+
+@pytest.fixture
+def inventory_data():
+    data = bytearray(b"".join(RECORDS).ljust(RECORD_LENGTH * 40, b"\x00"))
+    data[884:887] = (1234).to_bytes(3, "little")
+    return bytes(data)
+
+
+def test_scalar_inventory(config, price_guide, inventory_data):
+    parser = InventoryParser(config, price_guide, batch=False)
+    inventory = parser.parse(inventory_data, 1, Config.Lang.EN)
+
+    assert inventory.meseta == 1234
+    assert [entry[0] for entry in inventory.inventory[:6]] == [
+        "000100",
+        "010100",
+        "030000",
+        "010300",
+        "020005",
+        "03020E",
+    ]
+    assert inventory.inventory[2][1]["number"] == 5
+
+
+def test_batch_inventory_matches_scalar(config, price_guide, inventory_data):
+    pytest.importorskip("numpy")
+
+    # Separate caches, so neither pass returns items the other decoded
+    scalar = InventoryParser(config, price_guide, batch=False, cache=ItemCache())
+    batch = InventoryParser(config, price_guide, batch=True, cache=ItemCache())
+
+    expected = scalar.parse(inventory_data, 1, Config.Lang.EN)
+    actual = batch.parse(inventory_data, 1, Config.Lang.EN)
+
+    assert actual.meseta == expected.meseta
+    assert actual.inventory == expected.inventory
+    assert actual.inventory[0][1] is not expected.inventory[0][1]
+
+
+def test_batch_classification(config, price_guide, inventory_data):
+    np = pytest.importorskip("numpy")
+
+    parser = InventoryParser(config, price_guide, batch=True)
+    records = parser.records_array(inventory_data, RECORD_LENGTH)
+
+    blank = parser.blank_mask(records)
+    assert blank.tolist() == [
+        parser.is_blank(inventory_data[i : i + RECORD_LENGTH])
+        for i in range(0, len(inventory_data), RECORD_LENGTH)
+    ]
+
+    codes = parser.item_codes_array(records)
+    # Codes past the type table, an S-rank weapon and another item
+    srank = min(config.SRANK_WEAPON_CODES)
+    codes = np.append(codes, [0x700000 | srank, 0x700100])
+    types = parser.item_types_array(codes)
+    assert types[-2:].tolist() == [Config.ItemType.SRANK_WEAPON, Config.ItemType.OTHER]
+    for code, item_type in zip(codes.tolist(), types.tolist()):
+        assert item_type == parser.item_parser.get_item_type(code)
+
+
+def test_srank_weapon_from_readonly_buffer(config, price_guide):
+    # S-RANK "AB" SABER with the Zalure special
+    data = record(0x00, 0x70, 0x02, 0x05, 0x00, 0x00, 0x84, 0x22, 0x80, 0x00, 0x80)
+    data = data.ljust(RECORD_LENGTH * 40, b"\x00")
+    view = memoryview(data)
+
+    parser = InventoryParser(config, price_guide, batch=False)
+    inventory = parser.parse(view, 1, Config.Lang.EN)
+    item = inventory.inventory[0][1]
+
+    assert item["name"] == "S-RANK AB SABER"
+    assert item["element"] == "Zalure"
+    assert item["grinder"] == 5
+    assert view.tobytes() == data
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_lazy_inventory(config, price_guide, inventory_data, batch):
+    if batch:
+        pytest.importorskip("numpy")
+
+    eager = InventoryParser(config, price_guide, batch=batch, cache=ItemCache())
+    lazy = InventoryParser(
+        config, price_guide, batch=batch, lazy=True, cache=ItemCache()
+    )
+
+    expected = eager.parse(inventory_data, 1, Config.Lang.EN)
+    actual = lazy.parse(inventory_data, 1, Config.Lang.EN)
+
+    assert actual.meseta == expected.meseta
+    assert len(actual.inventory) == len(expected.inventory)
+
+    # Counting by type does not decode anything
+    tools = actual.items_of_type(Config.ItemType.TOOL)
+    assert len(tools) == 1
+    assert not any(entry[1].decoded for entry in actual.inventory[:-1])
+
+    assert tools[0][1]["display"] == "Monomate x5"
+    assert tools[0][1].decoded
+    assert [dict(entry[1]) for entry in actual.inventory] == [
+        dict(entry[1]) for entry in expected.inventory
+    ]
+
+
+@pytest.mark.parametrize("batch", [False, True])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_item_count_header(config, price_guide, inventory_data, batch, lazy):
+    if batch:
+        pytest.importorskip("numpy")
+    parser = InventoryParser(config, price_guide, batch=batch, lazy=lazy)
+
+    def codes(item_count):
+        inventory = parser.parse(inventory_data, 1, Config.Lang.EN, item_count)
+        return [entry[0] for entry in inventory.inventory[:-1]]
+
+    everything = codes(None)
+    # Scanning stops after the counted items, skipping the blank slot between
+    assert codes(3) == everything[:3]
+    assert codes(0) == []
+    # Counts that cannot fit in the region are ignored
+    assert codes(1000) == everything
+
+
+@pytest.mark.parametrize("batch", [False, True])
+@pytest.mark.parametrize("lazy", [False, True])
+def test_partial_record_tail(config, price_guide, batch, lazy):
+    if batch:
+        pytest.importorskip("numpy")
+    # Share bank regions are 4800 bytes, 171 records and a 12 byte tail
+    data = b"".join(RECORDS).ljust(4788, b"\x00") + bytes([0x03, 0x00, 0x00, 0x05] * 3)
+    parser = InventoryParser(config, price_guide, batch=batch, lazy=lazy)
+
+    inventory = parser.parse(data, 1, Config.Lang.EN)
+
+    assert len(inventory.inventory) == 7
+
+
+def test_is_blank(config, price_guide):
+    parser = InventoryParser(config, price_guide)
+
+    assert parser.is_blank(memoryview(RECORDS[1]))
+    assert parser.is_blank(RECORDS[4])
+    assert parser.is_blank(bytes([0x00] * 12 + [0xFF] * 4 + [0x00] * 8))
+    assert not parser.is_blank(RECORDS[0])
+
+
+def test_inventory_prices(config, price_guide, inventory_data):
+    parser = InventoryParser(config, price_guide, batch=False)
+    inventory = parser.parse(inventory_data, 1, Config.Lang.EN)
+
+    minimum, average, maximum = inventory.prices()
+    assert minimum <= average <= maximum
+    assert inventory.price(2) == maximum
+    for entry in inventory.inventory:
+        if "prices" in entry[1]:
+            assert len(entry[1]["prices"]) == 3
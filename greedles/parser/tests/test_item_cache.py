@@ -0,0 +1,68 @@
+"""
+Test the decoded item cache
+
+The cache is tested for LRU eviction and counters, and ItemParser is tested to
+hand back the same read-only item for repeated raw records.
+"""
+
+import pickle
+
+import pytest
+
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.model.item import Item
+from greedles.parser.item_cache import ItemCache
+from greedles.parser.item_parser import ItemParser
+from greedles.price_guide.price_guide import PRICE_GUIDE_DIRECTORY, PriceGuideFixed
+from greedles.tests.save_files import MONOMATE
+
+
+@pytest.fixture
+def item_parser():
+    config = Config(ItemCodesEN())
+    return ItemParser(config, PriceGuideFixed(PRICE_GUIDE_DIRECTORY), ItemCache(8))
+
+
+def test_cache_lru_eviction():
+    cache = ItemCache(2)
+    cache.put("a", {"name": "a"})
+    cache.put("b", {"name": "b"})
+    assert cache.get("a") == {"name": "a"}
+    cache.put("c", {"name": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("c") == {"name": "c"}
+    assert cache.stats() == {
+        "size": 2,
+        "maxsize": 2,
+        "hits": 2,
+        "misses": 1,
+        "evictions": 1,
+        "hit_ratio": 2 / 3,
+    }
+
+
+def test_cached_items_are_read_only():
+    item = ItemCache().put("a", {"name": "a", "pbs": ["x"], "status": {"def": 1}})
+
+    assert isinstance(item, Item)
+    assert item["pbs"] == ("x",)
+    with pytest.raises(TypeError):
+        item["name"] = "b"
+    with pytest.raises(TypeError):
+        item["status"].update({"def": 2})
+    assert pickle.loads(pickle.dumps(item)) == item
+
+
+def test_item_parser_cache_hits(item_parser: ItemParser):
+    first = item_parser.parse(MONOMATE, 0x030000, "EN")
+    second = item_parser.parse(memoryview(MONOMATE), 0x030000, "EN")
+
+    assert first is second
+    assert first["number"] == 5
+    assert item_parser.cache.hits == 1
+    assert item_parser.cache.misses == 1
+
+    # Items carry the price of every strategy, there is none to key on
+    assert len(first["prices"]) == 3
@@ -0,0 +1,120 @@
+"""
+Test the item parser module
+
+parse_many is checked against record-by-record parse, including slot order,
+repeated records and the batch weapon attribute extraction.
+"""
+
+import pytest
+
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.parser.item_cache import ItemCache
+from greedles.parser import item_parser
+from greedles.parser.item_parser import ItemParser, price_item
+from greedles.price_guide.price_guide import PRICE_GUIDE_DIRECTORY, PriceGuideFixed
+from greedles.price_guide.price_table import ZERO_PRICE
+
+
+def record(*data: int) -> bytes:
+    return bytes(data).ljust(28, b"\x00")
+
+
+RECORDS = [
+    record(0x00, 0x01, 0x00, 0x02, 0x00, 0x00, 0x01, 0x14, 0x05, 0x1E),
+    record(0x03, 0x00, 0x00, 0x00, 0x00, 0x05),
+    # Excalibur with the hit listed before a duplicate native attribute
+    record(0x00, 0xAC, 0x00, 0x00, 0x00, 0x00, 0x05, 0x28, 0x01, 0x32, 0x01, 0x0A),
+    record(0x01, 0x01, 0x00, 0x00, 0x00, 0x03, 0x02, 0x00, 0x01),
+    record(0x03, 0x00, 0x00, 0x00, 0x00, 0x05),
+    record(0x00, 0x01, 0x00, 0x02, 0x00, 0x00, 0x01, 0x14, 0x05, 0x1E),
+    # Mag LV5 with 5.00 DEF and 2.56 POW, and a disk
+    record(0x02, 0x00, 0x05, 0x00, 0xF4, 0x01, 0x00, 0x01, *[0x00] * 8, 0x78, 0xC8),
+    record(0x03, 0x02, 0x0E, 0x00, 0x00),
+]
+
+
+@pytest.fixture
+def price_guide():
+    return PriceGuideFixed(PRICE_GUIDE_DIRECTORY)
+
+
+@pytest.fixture
+def config():
+    return Config(ItemCodesEN())
+
+
+def test_parse_many_matches_parse(config, price_guide):
+    batch = ItemParser(config, price_guide, ItemCache())
+    single = ItemParser(config, price_guide, ItemCache())
+
+    items = batch.parse_many(RECORDS, "EN")
+    expected = [
+        single.parse(data, int.from_bytes(data[:3], "big"), "EN") for data in RECORDS
+    ]
+
+    assert items == expected
+    assert items[0] is items[5]
+    assert items[2]["attribute"]["hit"] == 40
+    assert items[2]["attribute"]["native"] == 50
+    assert items[6]["status"] == {"def": 5.0, "pow": 2.56, "dex": 0.0, "mind": 0.0}
+    assert (items[6]["sync"], items[6]["iq"]) == (120, 200)
+    assert items[7]["level"] == 15
+    # Six distinct records, each decoded once
+    assert batch.cache.stats()["size"] == 6
+
+
+def test_parse_many_without_numpy(config, price_guide, monkeypatch):
+    expected = ItemParser(config, price_guide, ItemCache()).parse_many(RECORDS, "EN")
+    monkeypatch.setattr(item_parser, "np", None)
+
+    assert ItemParser(config, price_guide, ItemCache()).parse_many(RECORDS, "EN") == (
+        expected
+    )
+
+
+def test_attributes_many(config, price_guide):
+    parser = ItemParser(config, price_guide, ItemCache())
+    weapons = [RECORDS[0], RECORDS[2]]
+
+    assert parser.get_attributes_many(weapons) == [
+        (20, 0, 0, 0, 30),
+        (50, 0, 0, 0, 40),
+    ]
+    assert parser.parse_many([RECORDS[2]], "EN")[0]["prices"][0] > 0
+
+
+def test_disk_level_byte_not_wrapped(config, price_guide):
+    disk = record(0x03, 0x02, 0xFF, 0x00, 0x00)
+
+    [batch] = ItemParser(config, price_guide, ItemCache()).parse_many([disk], "EN")
+    single = ItemParser(config, price_guide, ItemCache()).parse(disk, 0x0302FF, "EN")
+
+    assert batch == single
+    assert batch["level"] == 256
+
+
+def test_price_item_not_in_guide(price_guide):
+    priced = price_item(price_guide, "unit", "No Such Unit")
+
+    assert priced["prices"] == ZERO_PRICE
+
+
+def test_price_item_errors(price_guide):
+    # A wrong call is a bug, not an item missing from the guide
+    with pytest.raises(TypeError):
+        price_item(price_guide, "unit")
+
+    del price_guide.compiled["units"]
+    with pytest.raises(KeyError):
+        price_item(price_guide, "unit", "Adept")
+
+
+def test_item_type_past_table(config, price_guide):
+    parser = ItemParser(config, price_guide, ItemCache())
+    srank = min(config.SRANK_WEAPON_CODES)
+
+    # Only the low 16 bits are checked for S-rank weapons
+    for high in (0x060000, 0x700000, 0xFF0000):
+        assert parser.get_item_type(high | srank | 0x05) == Config.ItemType.SRANK_WEAPON
+        assert parser.get_item_type(high | 0x0100) == Config.ItemType.OTHER
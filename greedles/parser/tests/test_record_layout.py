@@ -0,0 +1,78 @@
+"""
+Test the record layout module
+
+Layouts are checked for compilation into a single struct and the character
+layout is checked against a synthetic .psochar buffer.
+"""
+
+import pytest
+
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.parser.character_parser import CharacterParser
+from greedles.parser.record_layout import (
+    CHARACTER_LAYOUT,
+    Field,
+    RecordLayout,
+    Region,
+)
+from greedles.price_guide.price_guide import PRICE_GUIDE_DIRECTORY, PriceGuideFixed
+
+
+@pytest.fixture
+def character_data():
+    data = bytearray(CHARACTER_LAYOUT.size)
+    data[7] = 0x40
+    data[876] = 19
+    data[888:896] = "4208".encode("utf-16-le")
+    data[936] = 0x02
+    data[937] = 0x06
+    data[968:976] = "Rico".encode("utf-16-le")
+    data[11460:11472] = b"\x01" * 12
+    return bytes(data)
+
+
+def test_layout_compiles_to_one_struct():
+    layout = RecordLayout(
+        "test",
+        [Field("b", 4, 4, "u32"), Field("a", 0, 1, "u8"), Field("c", 8, 4, "utf16")],
+        [Region("rest", 8)],
+    )
+    data = bytes([7, 0, 0, 0, 1, 1, 0, 0]) + "AB".encode("utf-16-le")
+
+    assert layout.struct.format == "<B3xI4s"
+    assert layout.unpack(data) == {"a": 7, "b": 257, "c": "AB"}
+    assert layout.slice_regions(data) == {"rest": data[8:]}
+
+
+def test_layout_rejects_bad_fields():
+    with pytest.raises(ValueError):
+        RecordLayout("test", [Field("a", 0, 4, "u32"), Field("b", 2, 1, "u8")])
+    with pytest.raises(ValueError):
+        RecordLayout("test", [Field("a", 0, 2, "u32")])
+    with pytest.raises(ValueError):
+        Field("a", 0, 1, "float")
+
+
+def test_character_layout(character_data):
+    fields = CHARACTER_LAYOUT.unpack(character_data)
+
+    assert fields["mode"] == 0x40
+    assert fields["name"] == "Rico"
+    assert fields["guild_card_number"] == "4208"
+    assert fields["ep1_progress"] == 3
+    assert fields["ep2_progress"] == 0
+
+
+def test_character_parser(character_data):
+    config = Config(ItemCodesEN())
+    parser = CharacterParser(config, PriceGuideFixed(PRICE_GUIDE_DIRECTORY))
+    character = parser.parse(character_data, 1)
+
+    assert character.name == "Rico"
+    assert character.mode == Config.Mode.CLASSIC
+    assert character.character_class == "FOmarl"
+    assert character.section_id == "SKYLY"
+    assert character.level == 20
+    assert character.ep1_progress == "Stage 3 Cleared! | Bu-GOU"
+    assert character.ep2_progress == "No Progress"
@@ -0,0 +1,64 @@
+"""
+Test repricing decoded inventories after a price guide update
+"""
+
+import json
+from pathlib import Path
+
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.parser.inventory_parser import InventoryParser
+from greedles.parser.repricer import Repricer
+from greedles.parser.tests.test_inventory_parser import RECORD_LENGTH, RECORDS
+from greedles.price_guide.price_guide import PriceGuideFixed
+
+
+def parse(price_guide, lazy=False):
+    parser = InventoryParser(Config(ItemCodesEN()), price_guide, lazy=lazy)
+    data = b"".join(RECORDS).ljust(RECORD_LENGTH * 40, b"\x00")
+    return parser.parse(data, 1, Config.Lang.EN)
+
+
+def test_changed_entries(price_directory: Path):
+    previous = PriceGuideFixed(price_directory)
+    units = json.loads((price_directory / "units.json").read_text())
+    units["Knight/Power"] = {"base": "5"}
+    units["Adept"] = {"base": "1"}
+    (price_directory / "units.json").write_text(json.dumps(units))
+
+    changed = PriceGuideFixed(price_directory).changed_entries(previous)
+
+    assert changed == {("units", "knight/power"), ("units", "adept")}
+
+
+def test_reprice_only_changed_items(price_directory: Path):
+    previous = PriceGuideFixed(price_directory)
+    inventory = parse(previous)
+    before = [entry[1] for entry in inventory.inventory]
+
+    units = json.loads((price_directory / "units.json").read_text())
+    units["Knight/Power"] = {"base": "5-7"}
+    (price_directory / "units.json").write_text(json.dumps(units))
+    updated = PriceGuideFixed(price_directory)
+
+    Repricer(previous, updated).reprice_inventory(inventory)
+
+    after = [entry[1] for entry in inventory.inventory]
+    unit = next(item for item in after if item["type"] == Config.ItemType.UNIT)
+    assert unit["prices"] == (5, 6, 7)
+    # Every other item is the same object it was before
+    assert sum(old is not new for old, new in zip(before, after)) == 1
+    # Repricing agrees with decoding against the updated guide
+    assert [item.get("prices") for item in after] == [
+        entry[1].get("prices") for entry in parse(updated).inventory
+    ]
+
+
+def test_reprice_skips_undecoded_lazy_items(price_directory: Path):
+    previous = PriceGuideFixed(price_directory)
+    inventory = parse(previous, lazy=True)
+    (price_directory / "units.json").write_text('{"Knight/Power": {"base": "5"}}')
+
+    Repricer(previous, PriceGuideFixed(price_directory)).reprice_inventory(inventory)
+
+    assert not any(entry[1].decoded for entry in inventory.inventory[:-1])
@@ -0,0 +1,122 @@
+"""
+Test the two tier cache of decode results
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from greedles.model.config.config import Config
+from greedles.model.config.item_codes_en import ItemCodesEN
+from greedles.parser.parser import InputHandler, Parsers
+from greedles.parser.result_cache import ResultCache, content_key
+from greedles.price_guide.price_guide import PRICE_GUIDE_DIRECTORY, PriceGuideFixed
+from greedles.tests.save_files import MONOMATE, SHARE_BANK
+
+
+def test_content_key():
+    assert content_key("ab", "c") != content_key("a", "bc")
+    assert content_key("a", b"b") == content_key(b"a", "b")
+
+
+def test_memory_tier():
+    cache = ResultCache(max_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    assert cache.get("a") == b"12345"
+
+    # The least recently read result makes room
+    cache.put("c", b"12345")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"12345"
+    assert cache.evictions == 1
+    assert cache.size == 10
+
+    # Results larger than the cache are not kept
+    cache.put("d", b"x" * 11)
+    assert cache.get("d") is None
+
+
+def test_disk_tier(tmp_path: Path):
+    ResultCache(tmp_path).put("a", b"result")
+
+    # Another process finds the result and keeps it in memory
+    cache = ResultCache(tmp_path)
+    assert cache.get("a") == b"result"
+    assert cache.get("a") == b"result"
+    assert (cache.disk_hits, cache.hits) == (1, 1)
+
+
+def test_ttl(tmp_path: Path):
+    cache = ResultCache(tmp_path, ttl=60)
+    cache.put("a", b"result")
+    cache.clear()
+    path = tmp_path / "a.result"
+    written = time.time() - 61
+    os.utime(path, (written, written))
+
+    assert cache.get("a") is None
+    assert not path.exists()
+
+
+def test_disk_size(tmp_path: Path):
+    cache = ResultCache(tmp_path, max_disk_bytes=10)
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    read = time.time() - 10
+    os.utime(tmp_path / "a.result", (read, time.time()))
+    cache.put("c", b"12345")
+
+    # The least recently read file is removed
+    assert sorted(path.name for path in tmp_path.glob("*.result")) == [
+        "b.result",
+        "c.result",
+    ]
+    assert cache.disk_size == 10
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_private_directory(tmp_path: Path):
+    cache = ResultCache(tmp_path / "results")
+    assert (tmp_path / "results").stat().st_mode & 0o777 == 0o700
+    assert cache.directory is not None
+
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+    cache = ResultCache(shared)
+    cache.put("a", b"result")
+
+    # Another user could plant results, the disk tier is not used
+    assert cache.directory is None
+    assert list(shared.iterdir()) == []
+
+
+def test_decode_cached_files(tmp_path: Path):
+    parsers = Parsers(Config(ItemCodesEN()), PriceGuideFixed(PRICE_GUIDE_DIRECTORY))
+    cache = ResultCache(tmp_path)
+
+    def decode(files):
+        handler = InputHandler(parsers.config, parsers=parsers, result_cache=cache)
+        list(handler.decode_stream(files))
+        return handler
+
+    first = decode([(".psobank", SHARE_BANK), (".psoclassicbank", SHARE_BANK)])
+    # Unchanged files of a changed upload are still found, in any folder
+    changed = SHARE_BANK[:28] + MONOMATE + SHARE_BANK[56:]
+    second = decode(
+        [("Backup/.psobank", SHARE_BANK), ("Backup/.psoclassicbank", changed)]
+    )
+
+    assert cache.hits == 1
+    assert cache.misses == 3
+    # Cached models are copies, indexing all_items again leaves them alone
+    bank = first.share_banks[0].inventory.inventory
+    assert second.share_banks[0].inventory.inventory == bank
+    assert second.share_banks[0] is not first.share_banks[0]
+    # Files are cached as JSON
+    for path in tmp_path.glob("*.result"):
+        assert "share_bank" in json.loads(path.read_bytes())
@@ -0,0 +1,36 @@
+"""
+Compile the price guide JSON into a binary snapshot
+
+    python -m greedles.price_guide.compile [--directory DIR] [--output FILE]
+
+Workers constructing PriceGuideFixed with the snapshot path then load the
+compiled prices in one read instead of parsing every JSON file.
+"""
+
+from pathlib import Path
+import argparse
+import time
+
+from greedles.price_guide.price_guide import (
+    PRICE_GUIDE_DIRECTORY,
+    PRICE_GUIDE_SNAPSHOT,
+    PriceGuideFixed,
+)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--directory", type=Path, default=PRICE_GUIDE_DIRECTORY)
+    parser.add_argument("--output", type=Path, default=PRICE_GUIDE_SNAPSHOT)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    # A missing snapshot is always rebuilt, so remove any existing one
+    args.output.unlink(missing_ok=True)
+    guide = PriceGuideFixed(args.directory, args.output)
+    elapsed = time.perf_counter() - start
+    print(f"Compiled price guide {guide.version} to {args.output} in {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import functools
+import inspect
+import time
+
+# Sentinel for "not cached", prices themselves may be 0
+MISSING = object()
+
+
+class PriceCache:
+    """
+    Bounded LRU cache of resolved prices
+
+    Keyed on the normalized pricing inputs plus the price guide version, so
+    one cache stays correct even when shared between guides.
+    Lookup latency is recorded separately for hits and misses to help size it.
+    """
+
+    def __init__(self, maxsize: int = 16384):
+        self.maxsize = maxsize
+        self.prices: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hit_time_ns = 0
+        self.miss_time_ns = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Get a cached price, or MISSING"""
+        with self.lock:
+            price = self.prices.get(key, MISSING)
+            if price is not MISSING:
+                self.prices.move_to_end(key)
+            return price
+
+    def put(self, key: Hashable, price: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self.prices[key] = price
+            self.prices.move_to_end(key)
+            while len(self.prices) > self.maxsize:
+                self.prices.popitem(last=False)
+                self.evictions += 1
+
+    def record(self, hit: bool, elapsed_ns: int) -> None:
+        with self.lock:
+            if hit:
+                self.hits += 1
+                self.hit_time_ns += elapsed_ns
+            else:
+                self.misses += 1
+                self.miss_time_ns += elapsed_ns
+
+    def invalidate(self) -> None:
+        """Drop every cached price but keep the statistics"""
+        with self.lock:
+            self.prices.clear()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.prices.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.hit_time_ns = 0
+            self.miss_time_ns = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.prices),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "hit_latency_us": self.hit_time_ns / self.hits / 1000 if self.hits else 0.0,
+            "miss_latency_us": (
+                self.miss_time_ns / self.misses / 1000 if self.misses else 0.0
+            ),
+        }
+
+
+def freeze_argument(value: Any, normalize: Callable[[str], str]) -> Hashable:
+    """Make a pricing argument hashable, normalizing names"""
+    if isinstance(value, str):
+        return normalize(value)
+    if isinstance(value, dict):
+        return tuple(sorted(value.items()))
+    if isinstance(value, list):
+        return tuple(value)
+    return value
+
+
+def memoized_price(method: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Memoize a get_prices_* method of a price guide through its price_cache
+
+    The item_data argument is informational and left out of the key.
+    Exceptions are not cached.
+    """
+    parameters = list(inspect.signature(method).parameters)[1:]
+    ignored: Optional[int] = (
+        parameters.index("item_data") if "item_data" in parameters else None
+    )
+
+    @functools.wraps(method)
+    def wrapper(guide, *args, **kwargs) -> Any:
+        cache: Optional[PriceCache] = guide.price_cache
+        if cache is None:
+            return method(guide, *args, **kwargs)
+
+        start = time.perf_counter_ns()
+        key_args: Tuple = args[:ignored] if ignored is not None else args
+        key = (
+            method.__name__,
+            guide.version,
+            tuple(freeze_argument(arg, guide.normalize_name) for arg in key_args),
+            tuple(
+                (name, freeze_argument(arg, guide.normalize_name))
+                for name, arg in sorted(kwargs.items())
+                if name != "item_data"
+            ),
+        )
+        price = cache.get(key)
+        if price is MISSING:
+            price = method(guide, *args, **kwargs)
+            cache.put(key, price)
+            cache.record(False, time.perf_counter_ns() - start)
+        else:
+            cache.record(True, time.perf_counter_ns() - start)
+        return price
+
+    return wrapper
@@ -1,14 +1,41 @@
 from abc import ABC, abstractmethod
-from bisect import bisect
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 from pathlib import Path
 import asyncio
+import hashlib
 import json
 import logging
 
+try:
+    import aiohttp
+except ImportError:  # aiohttp is only needed by PriceGuideDynamic
+    aiohttp = None
+
+from greedles.price_guide.price_cache import PriceCache, memoized_price
+from greedles.price_guide.snapshot import read_snapshot, write_snapshot
+from greedles.price_guide.price_table import (
+    ZERO_PRICE,
+    PriceRange,
+    PriceTableException,
+    WeaponPrice,
+    add_prices,
+    compile_base_prices,
+    compile_threshold_prices,
+    compile_weapon_prices,
+    parse_price_range,
+    scale_prices,
+)
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Price guide JSON files shipped with the repository
+PRICE_GUIDE_DIRECTORY = (
+    Path(__file__).resolve().parents[2] / "resources" / "data" / "price_guide"
+)
+# Compiled snapshot of the shipped price guide, see greedles.price_guide.compile
+PRICE_GUIDE_SNAPSHOT = PRICE_GUIDE_DIRECTORY.parent / "price_guide.snapshot"
+
 
 class BasePriceStrategy(ABC):
     MINIMUM = 0
@@ -37,8 +64,39 @@ class PriceGuideParseException(PriceGuideException):
 
 
 class PriceGuideAbstract(ABC):
+    # Price guide attribute -> source JSON file
+    PRICE_FILES = {
+        "srank_weapon_prices": "srankweapons.json",
+        "weapon_prices": "weapons.json",
+        "frame_prices": "frames.json",
+        "barrier_prices": "barriers.json",
+        "unit_prices": "units.json",
+        "mag_prices": "mags.json",
+        "disk_prices": "disks.json",
+        "tool_prices": "tools.json",
+    }
+    # get_prices_<kind> -> category of the entry it prices from
+    PRICE_CATEGORIES = {
+        "srank_weapon": "srank_weapons",
+        "weapon": "weapons",
+        "frame": "frames",
+        "barrier": "barriers",
+        "unit": "units",
+        "mag": "mags",
+        "disk": "disks",
+        "tool": "tools",
+    }
+    # Attributes that make up the loaded prices, e.g. in a compiled snapshot
+    SNAPSHOT_ATTRIBUTES = list(PRICE_FILES) + [
+        "version",
+        "compiled",
+        "name_index",
+        "key_conflicts",
+    ]
+
     def __init__(self):
-        self.bps = BasePriceStrategy.MINIMUM
+        # Identifies the price data, changes whenever the prices are rebuilt
+        self.version: str = ""
         self.srank_weapon_prices: Dict[str, Any] = {}
         self.weapon_prices: Dict[str, Any] = {}
         self.frame_prices: Dict[str, Any] = {}
@@ -47,33 +105,190 @@ class PriceGuideAbstract(ABC):
         self.mag_prices: Dict[str, Any] = {}
         self.disk_prices: Dict[str, Any] = {}
         self.tool_prices: Dict[str, Any] = {}
+        # Category -> item name -> compiled numeric price entry
+        self.compiled: Dict[str, Dict[str, Any]] = {}
+        # Category -> lowercased item name -> key as spelled in the price data
+        self.name_index: Dict[str, Dict[str, str]] = {}
+        # Duplicate or case-colliding names found while loading the prices
+        self.key_conflicts: List[str] = []
+        # Memoizes get_price_* calls, None disables memoization
+        self.price_cache: Optional[PriceCache] = PriceCache()
 
     @staticmethod
-    def get_price_from_range(price_range: str, bps: BasePriceStrategy) -> float:
-        # Parse out the price range value from the price range dictionary
-        price_range_value: str = ""
-        if "-" in price_range:
-            price_range_value = price_range
-        else:
-            try:
-                price_value = float(price_range)
-                return price_value
-            except ValueError:
-                raise PriceGuideParseException(
-                    f"Price range {price_range} does not contain a base price in form of 'base' or 'base-price'"
+    def normalize_name(name: str) -> str:
+        """Normalize an item name for case-insensitive lookups"""
+        return name.lower()
+
+    def compile_prices(self) -> None:
+        """
+        Compile the loaded price JSON into numeric tables and index them
+
+        Called once the prices are built, so lookups never parse strings.
+        Placeholders like "N/A" are normalized here and anything else that
+        is not a price raises PriceGuideParseException.
+        """
+        try:
+            self.compiled = {
+                "srank_weapons": compile_base_prices(
+                    self.srank_weapon_prices.get("weapons", {})
+                ),
+                "srank_modifiers": compile_base_prices(
+                    self.srank_weapon_prices.get("modifiers", {})
+                ),
+                "weapons": compile_weapon_prices(self.weapon_prices),
+                "frames": compile_base_prices(self.frame_prices),
+                "barriers": compile_base_prices(self.barrier_prices),
+                "units": compile_base_prices(self.unit_prices),
+                "mags": compile_base_prices(self.mag_prices),
+                "disks": compile_threshold_prices(self.disk_prices),
+                "tools": compile_base_prices(self.tool_prices),
+            }
+        except PriceTableException as e:
+            raise PriceGuideParseException(str(e)) from e
+        self.build_name_index()
+        if self.price_cache is not None:
+            self.price_cache.invalidate()
+
+    @classmethod
+    def checksum(cls, sources: Dict[str, bytes]) -> str:
+        """SHA-256 of the source JSON files"""
+        digest = hashlib.sha256()
+        for filename in cls.PRICE_FILES.values():
+            digest.update(sources[filename])
+        return digest.hexdigest()
+
+    def load_sources(self, sources: Dict[str, bytes]) -> None:
+        """
+        Parse and compile the source JSON files, by filename
+
+        The current prices are kept if the sources are invalid.
+        """
+        previous = self.save_state()
+        try:
+            self.key_conflicts = []
+            for attribute, filename in self.PRICE_FILES.items():
+                setattr(
+                    self, attribute, self._parse_json_file(filename, sources[filename])
                 )
+            self.version = self.checksum(sources)[:16]
+            self.compile_prices()
+        except PriceGuideException:
+            self.restore_state(previous)
+            raise
+
+    def save_state(self) -> Dict[str, Any]:
+        return {
+            attribute: getattr(self, attribute)
+            for attribute in self.SNAPSHOT_ATTRIBUTES
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        for attribute in self.SNAPSHOT_ATTRIBUTES:
+            setattr(self, attribute, state[attribute])
+        if self.price_cache is not None:
+            self.price_cache.invalidate()
+
+    def _parse_json_file(self, filename: str, content: bytes) -> Dict[str, Any]:
+        """Parse the content of a source JSON file"""
+        try:
+            return json.loads(
+                content.decode("utf-8"),
+                object_pairs_hook=lambda pairs: self._unique_object(filename, pairs),
+            )
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            logger.error(f"Error parsing {filename}: {e}")
+            raise PriceGuideException(f"Error parsing {filename}: {e}")
+
+    def _unique_object(
+        self, filename: str, pairs: List[Tuple[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build a JSON object, reporting keys that appear more than once"""
+        obj: Dict[str, Any] = {}
+        for key, value in pairs:
+            if key in obj:
+                self.report_key_conflict(f"{filename}: duplicate key {key!r}")
+            obj[key] = value
+        return obj
+
+    def build_name_index(self) -> None:
+        """
+        Index every compiled price table by normalized item name
 
-        # Parse the price range value from the str to float based on the BasePriceStrategy
-        min_price, max_price = map(float, price_range_value.split("-"))
-        average_price = (min_price + max_price) / 2
+        Names that collide after normalization keep the first spelling and
+        are reported.
+        """
+        self.name_index = {}
+        for category, table in self.compiled.items():
+            index: Dict[str, str] = {}
+            for key in table:
+                normalized = self.normalize_name(key)
+                if normalized in index:
+                    self.report_key_conflict(
+                        f"{category}: {key!r} collides with {index[normalized]!r}"
+                    )
+                    continue
+                index[normalized] = key
+            self.name_index[category] = index
+
+    def price_sources(self, kind: str, *args) -> List[Tuple[str, str]]:
+        """
+        (category, normalized name) of every entry get_prices_<kind>(*args)
+        reads, whether or not the guide has it
+        """
+        category = self.PRICE_CATEGORIES.get(kind)
+        if category is None:
+            return []
+        sources = [(category, self.normalize_name(args[0]))]
+        if kind == "srank_weapon" and args[1]:
+            sources.append(("srank_modifiers", self.normalize_name(args[1])))
+        if kind == "frame" and args[3] > 0:
+            sources.append(("tools", self.normalize_name("AddSlot")))
+        return sources
+
+    def changed_entries(self, previous: "PriceGuideAbstract") -> Set[Tuple[str, str]]:
+        """
+        (category, normalized name) of every entry that differs from the
+        previous guide, including entries only one of them has
+        """
+        changed = set()
+        for category in self.compiled.keys() | previous.compiled.keys():
+            entries = self._normalized_entries(category)
+            previous_entries = previous._normalized_entries(category)
+            for name in entries.keys() | previous_entries.keys():
+                if entries.get(name) != previous_entries.get(name):
+                    changed.add((category, name))
+        return changed
+
+    def _normalized_entries(self, category: str) -> Dict[str, Any]:
+        table = self.compiled.get(category, {})
+        return {
+            name: table[key] for name, key in self.name_index.get(category, {}).items()
+        }
+
+    def report_key_conflict(self, message: str) -> None:
+        logger.warning(f"Price guide key conflict in {message}")
+        self.key_conflicts.append(message)
+
+    def find_key(self, category: str, name: str) -> Optional[str]:
+        """Find the price data key for name, ignoring case"""
+        return self.name_index.get(category, {}).get(self.normalize_name(name))
+
+    def lookup(self, category: str, name: str) -> Any:
+        """Get the compiled price entry for name, raising if it is unknown"""
+        key = self.find_key(category, name)
+        if key is None:
+            raise PriceGuideExceptionItemNameNotFound(
+                f"Item name {name} not found in {category}"
+            )
+        return self.compiled[category][key]
 
-        # Perform the price calculation based on the BasePriceStrategy
-        if bps == BasePriceStrategy.MINIMUM:
-            return min_price
-        elif bps == BasePriceStrategy.MAXIMUM:
-            return max_price
-        else:  # AVERAGE
-            return average_price
+    @staticmethod
+    def get_price_from_range(price_range: str, bps: BasePriceStrategy) -> float:
+        """Price of a raw 'base' or 'min-max' price string under bps"""
+        try:
+            return parse_price_range(price_range)[bps]
+        except PriceTableException as e:
+            raise PriceGuideParseException(str(e)) from e
 
     @staticmethod
     def get_price_for_item_range(
@@ -86,57 +301,42 @@ class PriceGuideAbstract(ABC):
         """Build the price database from the source"""
         pass
 
-    def get_price_srank_weapon(
+    @memoized_price
+    def get_prices_srank_weapon(
         self,
         name: str,
         ability: str,
         grinder: int,
         element: str,
         item_data: Optional[Dict] = None,
-    ) -> float:
-        """Get price for S-rank weapon"""
-
-        actual_key = next(
-            (
-                key
-                for key in self.srank_weapon_prices["weapons"].keys()
-                if key.lower() == name.lower()
-            ),
-            None,
-        )
+    ) -> PriceRange:
+        """Get (min, avg, max) prices for S-rank weapon"""
+
+        actual_key = self.find_key("srank_weapons", name)
 
         if actual_key is None:
             raise PriceGuideExceptionItemNameNotFound(
                 f"Item name {name} not found in srank_weapon_prices"
             )
 
-        base_price = self.srank_weapon_prices["weapons"][actual_key]["base"]
+        prices = self.compiled["srank_weapons"][actual_key]
 
-        ability_price = 0
         if ability:
-            actual_ability = next(
-                (
-                    key
-                    for key in self.srank_weapon_prices["modifiers"].keys()
-                    if key.lower() == ability.lower()
-                ),
-                None,
-            )
+            actual_ability = self.find_key("srank_modifiers", ability)
 
             if actual_ability is None:
                 raise PriceGuideExceptionAbilityNameNotFound(
                     f"Ability {ability} not found in srank_weapon_prices"
                 )
 
-            ability_price = self.srank_weapon_prices["modifiers"][actual_ability][
-                "base"
-            ]
-
-        total_price = float(base_price) + float(ability_price)
+            prices = add_prices(
+                prices, self.compiled["srank_modifiers"][actual_ability]
+            )
 
-        return total_price
+        return prices
 
-    def get_price_weapon(
+    @memoized_price
+    def get_prices_weapon(
         self,
         name: str,
         weapon_attributes: Dict,
@@ -144,172 +344,348 @@ class PriceGuideAbstract(ABC):
         grinder: int,
         element: str,
         item_data: Optional[Dict] = None,
-    ) -> float:
-        """Get price for normal weapon"""
+    ) -> PriceRange:
+        """Get (min, avg, max) prices for normal weapon"""
 
-        actual_key = next(
-            (key for key in self.weapon_prices.keys() if key.lower() == name.lower()),
-            None,
-        )
+        actual_key = self.find_key("weapons", name)
 
         if actual_key is None:
             raise PriceGuideExceptionItemNameNotFound(
                 f"Item name {name} not found in weapon_prices"
             )
 
-        base_price = self.get_price_from_range(
-            self.weapon_prices[actual_key]["base"], self.bps
-        )
+        weapon: WeaponPrice = self.compiled["weapons"][actual_key]
+        prices = weapon.base
 
         if weapon_attributes:
             for attribute, value in weapon_attributes.items():
-                if value > HIGH_ATTRIBUTE_THRESHOLD:
-                    ability_price = self.weapon_prices[actual_key]["modifiers"][
-                        attribute
-                    ]
-                    base_price += ability_price
-
-        hit_values = self.weapon_prices[actual_key].get("hit_values", {})
-
-        if hit_values and hit > 0:
-            # Convert string keys to integers and sort
-            sorted_thresholds = sorted(map(int, hit_values.keys()))
-
-            # Find the largest threshold <= actual hit value
-            index = bisect(sorted_thresholds, hit) - 1
+                if value > HIGH_ATTRIBUTE_THRESHOLD and attribute in weapon.modifiers:
+                    prices = add_prices(prices, weapon.modifiers[attribute])
 
-            if index >= 0:
-                threshold = sorted_thresholds[index]
-                price_range = hit_values[str(threshold)]
-                hit_price = self.get_price_from_range(price_range, self.bps)
-                base_price += hit_price
+        if hit > 0:
+            # Price of the largest hit threshold <= actual hit value
+            hit_prices = weapon.hit_values.find(hit)
+            if hit_prices is not None:
+                prices = add_prices(prices, hit_prices)
 
-        return base_price
+        return prices
 
-    def get_price_frame(
+    @memoized_price
+    def get_prices_frame(
         self,
         name: str,
         addition: Dict[str, int],
         max_addition: Dict[str, int],
         slot: int,
         item_data: Optional[Dict] = None,
-    ) -> float:
-        """Get price for frame"""
+    ) -> PriceRange:
+        """Get (min, avg, max) prices for frame"""
         logger.info(f"get_price_frame: {name} {addition} {max_addition} {slot}")
-        price_range = self.frame_prices[name]["base"]
-        base_price = self.get_price_from_range(price_range, self.bps)
+        prices = self.lookup("frames", name)
         if slot > 0:
-            base_price += self.get_price_tool("AddSlot", slot)
+            prices = add_prices(prices, self.get_prices_tool("AddSlot", slot))
 
-        return base_price
+        return prices
 
-    def get_price_barrier(
+    @memoized_price
+    def get_prices_barrier(
         self, name: str, addition: Dict[str, int], max_addition: Dict[str, int]
-    ) -> float:
-        """Get price for barrier"""
+    ) -> PriceRange:
+        """Get (min, avg, max) prices for barrier"""
         logger.info(f"get_price_barrier: {name} {addition} {max_addition}")
-        price_range = self.barrier_prices[name]["base"]
-        base_price = self.get_price_from_range(price_range, self.bps)
-
-        return base_price
-
-    def get_price_unit(self, name: str) -> float:
-        """Get price for unit"""
-        price_range = self.unit_prices[name]["base"]
-        return self.get_price_for_item_range(price_range, 1, self.bps)
+        return self.lookup("barriers", name)
 
-    def get_price_mag(self, name: str, level: int) -> float:
-        """Get price for mag"""
-        price_range = self.mag_prices[name]["base"]
-        return self.get_price_for_item_range(price_range, 1, self.bps)
+    @memoized_price
+    def get_prices_unit(self, name: str) -> PriceRange:
+        """Get (min, avg, max) prices for unit"""
+        return self.lookup("units", name)
 
-    def get_price_disk(self, name: str, level: int) -> float:
-        levels = self.disk_prices[name]
-        # Convert string keys to integers and sort
-        sorted_thresholds = sorted(map(int, levels.keys()))
+    @memoized_price
+    def get_prices_mag(self, name: str, level: int) -> PriceRange:
+        """Get (min, avg, max) prices for mag"""
+        return self.lookup("mags", name)
 
-        # Find the largest threshold <= actual level value
-        index = bisect(sorted_thresholds, level) - 1
-
-        if index >= 0:
-            threshold = sorted_thresholds[index]
-            price_range = levels[str(threshold)]
-            price = self.get_price_from_range(price_range, self.bps)
-            return price
+    @memoized_price
+    def get_prices_disk(self, name: str, level: int) -> PriceRange:
+        # Price of the largest level threshold <= actual level value
+        prices = self.lookup("disks", name).find(level)
 
         # If not found, it's not worth anything.
-        return 0
+        if prices is None:
+            return ZERO_PRICE
+        return prices
 
-    def get_price_tool(self, name: str, number: int) -> float:
-        """Get price for tool"""
+    @memoized_price
+    def get_prices_tool(self, name: str, number: int) -> PriceRange:
+        """Get (min, avg, max) prices for tool"""
 
         # Check if the tool exists in the price database
-        if name not in self.tool_prices:
-            return 0
+        key = self.find_key("tools", name)
+        if key is None:
+            return ZERO_PRICE
 
-        # Get the price range string
-        price_range = self.tool_prices[name]["base"]
-        return self.get_price_for_item_range(price_range, number, self.bps)
+        return scale_prices(self.compiled["tools"][key], number)
 
-    def get_price_other(self, name: str, number: int) -> float:
-        """Get price for other items"""
+    @memoized_price
+    def get_prices_other(self, name: str, number: int) -> PriceRange:
+        """Get (min, avg, max) prices for other items"""
         logger.info(f"get_price_other: {name} {number}")
-        return 0
+        return ZERO_PRICE
+
+    # Single prices under one BasePriceStrategy, minimum unless given
+
+    def get_price_srank_weapon(
+        self, *args, strategy: int = BasePriceStrategy.MINIMUM, **kwargs
+    ) -> float:
+        return self.get_prices_srank_weapon(*args, **kwargs)[strategy]
+
+    def get_price_weapon(
+        self, *args, strategy: int = BasePriceStrategy.MINIMUM, **kwargs
+    ) -> float:
+        return self.get_prices_weapon(*args, **kwargs)[strategy]
+
+    def get_price_frame(
+        self, *args, strategy: int = BasePriceStrategy.MINIMUM, **kwargs
+    ) -> float:
+        return self.get_prices_frame(*args, **kwargs)[strategy]
+
+    def get_price_barrier(
+        self, *args, strategy: int = BasePriceStrategy.MINIMUM, **kwargs
+    ) -> float:
+        return self.get_prices_barrier(*args, **kwargs)[strategy]
+
+    def get_price_unit(
+        self, *args, strategy: int = BasePriceStrategy.MINIMUM, **kwargs
+    ) -> float:
+        return self.get_prices_unit(*args, **kwargs)[strategy]
+
+    def get_price_mag(
+        self, *args, strategy: int = BasePriceStrategy.MINIMUM, **kwargs
+    ) -> float:
+        return self.get_prices_mag(*args, **kwargs)[strategy]
+
+    def get_price_disk(
+        self, *args, strategy: int = BasePriceStrategy.MINIMUM, **kwargs
+    ) -> float:
+        return self.get_prices_disk(*args, **kwargs)[strategy]
+
+    def get_price_tool(
+        self, *args, strategy: int = BasePriceStrategy.MINIMUM, **kwargs
+    ) -> float:
+        return self.get_prices_tool(*args, **kwargs)[strategy]
+
+    def get_price_other(
+        self, *args, strategy: int = BasePriceStrategy.MINIMUM, **kwargs
+    ) -> float:
+        return self.get_prices_other(*args, **kwargs)[strategy]
 
 
 class PriceGuideFixed(PriceGuideAbstract):
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, snapshot_path: Optional[str] = None):
+        """
+        Load prices from the JSON files in directory
+
+        With snapshot_path, prices load from that compiled snapshot while it
+        matches the JSON files, and the snapshot is rewritten when it does not.
+        """
         super().__init__()
         self.directory = Path(directory)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
         asyncio.run(self.build_prices())
 
     async def build_prices(self) -> None:
         """Build price database from local JSON files"""
+        sources = {
+            filename: self._read_file(filename)
+            for filename in self.PRICE_FILES.values()
+        }
+        checksum = self.checksum(sources)
+        if self.snapshot_path and self.load_snapshot(self.snapshot_path, checksum):
+            logger.info(f"Price database loaded from {self.snapshot_path}")
+            return
+
         logger.info(f"Building price database from {self.directory}")
-        self.srank_weapon_prices = self._load_json_file("srankweapons.json")
-        self.weapon_prices = self._load_json_file("weapons.json")
-        self.frame_prices = self._load_json_file("frames.json")
-        self.barrier_prices = self._load_json_file("barriers.json")
-        self.unit_prices = self._load_json_file("units.json")
-        self.mag_prices = self._load_json_file("mags.json")
-        self.disk_prices = self._load_json_file("disks.json")
-        self.tool_prices = self._load_json_file("tools.json")
+        self.load_sources(sources)
         logger.info(f"Price database built from {self.directory}")
 
-    def _load_json_file(self, filename: str) -> Dict[str, Any]:
-        """Load and parse a JSON file from the directory"""
+        if self.snapshot_path:
+            self.write_snapshot(self.snapshot_path, checksum)
+
+    def load_snapshot(self, path: Path, checksum: str) -> bool:
+        """Load a compiled snapshot of the prices, False if it is missing or stale"""
+        state = read_snapshot(path, checksum)
+        if state is None:
+            return False
+        self.restore_state(state)
+        return True
+
+    def write_snapshot(self, path: Path, checksum: str) -> None:
+        """Save the compiled prices so later loads skip parsing the JSON"""
+        try:
+            write_snapshot(path, checksum, self.save_state())
+        except OSError as e:
+            logger.warning(f"Could not write price guide snapshot {path}: {e}")
+
+    def _read_file(self, filename: str) -> bytes:
+        """Read a source file from the directory"""
         file_path = self.directory / filename
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+            with open(file_path, "rb") as f:
+                return f.read()
+        except FileNotFoundError as e:
             logger.error(f"Error loading {filename} from {file_path}: {e}")
             raise PriceGuideException(f"Error loading {filename} from {file_path}: {e}")
 
 
 class PriceGuideDynamic(PriceGuideAbstract):
-    def __init__(self, api_url: str):
+    """
+    Prices fetched from a web API serving the price guide JSON files
+
+    Every category is fetched concurrently over one pooled aiohttp session
+    and revalidated with ETag / If-Modified-Since. With a cache directory the
+    last good responses and their validators are kept on disk, so restarts
+    revalidate instead of refetching, and a source that is down falls back
+    to them. Build with `await PriceGuideDynamic.create(...)`, or construct
+    and `await guide.build_prices()`; nothing here starts an event loop.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        cache_directory: Optional[str] = None,
+        timeout: float = 10.0,
+        max_connections: int = 8,
+    ):
         super().__init__()
-        self.api_url = api_url
-        asyncio.run(self.build_prices())
+        self.api_url = api_url.rstrip("/")
+        self.cache_directory = Path(cache_directory) if cache_directory else None
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.session: Optional["aiohttp.ClientSession"] = None
+        # Filename -> last good response body and its validators
+        self.responses: Dict[str, Dict[str, Any]] = {}
+        self._load_cached_responses()
+
+    @classmethod
+    async def create(cls, api_url: str, **kwargs) -> "PriceGuideDynamic":
+        guide = cls(api_url, **kwargs)
+        await guide.build_prices()
+        return guide
 
     async def build_prices(self) -> None:
-        """Build price database from web API"""
-        pass
         """
-        # This is a placeholder for the actual implementation
-        async with aiohttp.ClientSession() as session:
-            try:
-                # Example of how it might work:
-                # async with session.get(f"{self.api_url}/prices") as response:
-                #     data = await response.json()
-                #     self.srank_weapon_prices = data.get("srankweapons", {})
-                #     self.weapon_prices = data.get("weapons", {})
-                #     # etc...
-                pass
-            except aiohttp.ClientError as e:
-                print(f"Error fetching prices: {e}")
+        Build price database from web API
+
+        Categories that cannot be fetched use their last good response. If
+        the new prices cannot be built at all the current prices are kept,
+        and PriceGuideException is raised only when there are none.
         """
+        logger.info(f"Building price database from {self.api_url}")
+        filenames = list(self.PRICE_FILES.values())
+        results = await asyncio.gather(
+            *(self._fetch(filename) for filename in filenames)
+        )
+        responses = dict(zip(filenames, results))
+
+        try:
+            self._load_responses(responses)
+        except PriceGuideException as e:
+            if self.version:
+                logger.error(f"Keeping price guide {self.version}: {e}")
+                return
+            # Nothing loaded yet, fall back to the last good responses
+            logger.error(f"Falling back to the cached prices: {e}")
+            self._load_responses(
+                {filename: self.responses.get(filename) for filename in filenames}
+            )
+            return
+
+        for filename, response in responses.items():
+            if response is not self.responses.get(filename):
+                self.responses[filename] = response
+                self._store_cached_response(filename, response)
+        logger.info(f"Price database built from {self.api_url}")
+
+    def _load_responses(self, responses: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        missing = [filename for filename, response in responses.items() if not response]
+        if missing:
+            raise PriceGuideException(f"No prices available for {missing}")
+        self.load_sources(
+            {filename: response["body"] for filename, response in responses.items()}
+        )
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        if aiohttp is None:
+            raise PriceGuideException("PriceGuideDynamic requires aiohttp")
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def _fetch(self, filename: str) -> Optional[Dict[str, Any]]:
+        """Fetch or revalidate one category, None if there is no usable response"""
+        cached = self.responses.get(filename)
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        url = f"{self.api_url}/{filename}"
+        session = await self._get_session()
+        try:
+            async with session.get(url, headers=headers) as response:
+                if response.status == 304 and cached:
+                    return cached
+                response.raise_for_status()
+                return {
+                    "body": await response.read(),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Error fetching {url}, using the cached response: {e}")
+            return cached
+
+    def _cache_paths(self, filename: str) -> Tuple[Path, Path]:
+        return (
+            self.cache_directory / filename,
+            self.cache_directory / f"{filename}.validators.json",
+        )
+
+    def _load_cached_responses(self) -> None:
+        if self.cache_directory is None:
+            return
+        for filename in self.PRICE_FILES.values():
+            body_path, validators_path = self._cache_paths(filename)
+            try:
+                body = body_path.read_bytes()
+                validators = json.loads(validators_path.read_text())
+            except (OSError, ValueError):
+                continue
+            self.responses[filename] = {"body": body, **validators}
+
+    def _store_cached_response(self, filename: str, response: Dict[str, Any]) -> None:
+        if self.cache_directory is None:
+            return
+        body_path, validators_path = self._cache_paths(filename)
+        validators = {
+            "etag": response.get("etag"),
+            "last_modified": response.get("last_modified"),
+        }
+        try:
+            self.cache_directory.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(response["body"])
+            validators_path.write_text(json.dumps(validators))
+        except OSError as e:
+            logger.warning(f"Could not cache {filename} in {self.cache_directory}: {e}")
 
 
 # Example usage:
@@ -318,4 +694,6 @@ if __name__ == "__main__":
     fixed_guide = PriceGuideFixed("resources/data/price_guide/")
 
     # Using dynamic prices from web API
-    dynamic_guide = PriceGuideDynamic("https://api.pioneer2.net/prices")
+    dynamic_guide = asyncio.run(
+        PriceGuideDynamic.create("https://api.pioneer2.net/prices")
+    )
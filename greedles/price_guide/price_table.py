@@ -0,0 +1,126 @@
+from bisect import bisect
+from typing import Any, Dict, List, Optional, Tuple
+import re
+
+# (minimum, average, maximum), indexed by BasePriceStrategy
+PriceRange = Tuple[float, float, float]
+
+ZERO_PRICE: PriceRange = (0.0, 0.0, 0.0)
+
+# Placeholders the price guide uses for "no price"
+NO_PRICE_VALUES = {"", "-", "N/A"}
+
+PRICE_PATTERN = re.compile(r"^\s*(\d*\.?\d+)\s*(?:-\s*(\d*\.?\d+)\s*|(\+)\s*)?$")
+
+
+def add_prices(a: PriceRange, b: PriceRange) -> PriceRange:
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+
+def scale_prices(prices: PriceRange, number: float) -> PriceRange:
+    return (prices[0] * number, prices[1] * number, prices[2] * number)
+
+
+class PriceTableException(ValueError):
+    pass
+
+
+def parse_price_range(value: Any) -> PriceRange:
+    """
+    Parse a price guide value into a (min, avg, max) range
+
+    Accepts "9", "9-12" and ".5"; "30+" is read as its lower bound, and the
+    "N/A" and "-" placeholders as no price.
+    """
+    if isinstance(value, (int, float)):
+        return (float(value), float(value), float(value))
+    if not isinstance(value, str):
+        raise PriceTableException(f"Price {value!r} is not a string or number")
+    if value.strip() in NO_PRICE_VALUES:
+        return ZERO_PRICE
+    match = PRICE_PATTERN.match(value)
+    if match is None:
+        raise PriceTableException(
+            f"Price {value!r} is not in the form 'base', 'base+' or 'min-max'"
+        )
+    low = float(match.group(1))
+    high = float(match.group(2)) if match.group(2) else low
+    return (low, (low + high) / 2, high)
+
+
+class ThresholdTable:
+    """Prices keyed by the lowest value they apply from, e.g. hit or disk level"""
+
+    def __init__(self, entries: Dict[str, Any]):
+        pairs = sorted(
+            (int(key), parse_price_range(value)) for key, value in entries.items()
+        )
+        self.thresholds: List[int] = [threshold for threshold, _ in pairs]
+        self.prices: List[PriceRange] = [price for _, price in pairs]
+
+    def __bool__(self) -> bool:
+        return bool(self.thresholds)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, ThresholdTable)
+            and self.thresholds == other.thresholds
+            and self.prices == other.prices
+        )
+
+    def find(self, value: int) -> Optional[PriceRange]:
+        """Price of the largest threshold <= value, None below the first one"""
+        index = bisect(self.thresholds, value) - 1
+        return self.prices[index] if index >= 0 else None
+
+
+class WeaponPrice:
+    """Compiled price entry of a normal weapon"""
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.base = parse_price_range(entry.get("base", "0"))
+        self.modifiers: Dict[str, PriceRange] = {
+            attribute: parse_price_range(value)
+            for attribute, value in entry.get("modifiers", {}).items()
+        }
+        self.hit_values = ThresholdTable(entry.get("hit_values", {}))
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, WeaponPrice)
+            and self.base == other.base
+            and self.modifiers == other.modifiers
+            and self.hit_values == other.hit_values
+        )
+
+
+def compile_base_prices(table: Dict[str, Any]) -> Dict[str, PriceRange]:
+    """Compile a table of {"name": {"base": price}} entries"""
+    return {
+        name: compile_entry(name, lambda: parse_price_range(entry["base"]))
+        for name, entry in table.items()
+    }
+
+
+def compile_threshold_prices(table: Dict[str, Any]) -> Dict[str, ThresholdTable]:
+    """Compile a table of {"name": {"threshold": price}} entries"""
+    return {
+        name: compile_entry(name, lambda: ThresholdTable(entry))
+        for name, entry in table.items()
+    }
+
+
+def compile_weapon_prices(table: Dict[str, Any]) -> Dict[str, WeaponPrice]:
+    """Compile the normal weapon table"""
+    return {
+        name: compile_entry(name, lambda: WeaponPrice(entry))
+        for name, entry in table.items()
+    }
+
+
+def compile_entry(name: str, compile_fn):
+    """Run compile_fn, naming the entry in any error it raises"""
+    try:
+        return compile_fn()
+    except (PriceTableException, KeyError, TypeError, ValueError) as e:
+        raise PriceTableException(f"Invalid price entry {name!r}: {e}") from e
@@ -0,0 +1,108 @@
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Callable, List, Optional, Tuple
+import logging
+
+from greedles.price_guide.price_guide import PriceGuideException, PriceGuideFixed
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# (filename, mtime_ns, size) of every price file, None for missing files
+Fingerprint = Tuple[Tuple[str, Optional[int], Optional[int]], ...]
+
+
+class PriceGuideReloader:
+    """
+    Keeps a PriceGuideFixed in step with its price directory
+
+    The directory is polled for changed files; a changed directory is built
+    into a new guide off the request path and swapped in with a single
+    attribute assignment. Readers take `current` once per request and keep
+    using that guide, so lookups never wait on a lock and in-flight requests
+    finish against the prices they started with.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        snapshot_path: Optional[str] = None,
+        interval: float = 30.0,
+    ):
+        self.directory = Path(directory)
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        # Called with the new guide after every swap
+        self.listeners: List[Callable[[PriceGuideFixed], None]] = []
+        # Serializes builds only, never taken by readers
+        self.build_lock = Lock()
+        self.stopped = Event()
+        self.thread: Optional[Thread] = None
+
+        self.fingerprint = self.read_fingerprint()
+        self.current = self.build()
+
+    def build(self) -> PriceGuideFixed:
+        return PriceGuideFixed(self.directory, self.snapshot_path)
+
+    def read_fingerprint(self) -> Fingerprint:
+        fingerprint = []
+        for filename in PriceGuideFixed.PRICE_FILES.values():
+            try:
+                stat = (self.directory / filename).stat()
+                fingerprint.append((filename, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                fingerprint.append((filename, None, None))
+        return tuple(fingerprint)
+
+    def poll(self) -> bool:
+        """Reload if any price file changed, True if a new guide was swapped in"""
+        if self.read_fingerprint() == self.fingerprint:
+            return False
+        return self.reload()
+
+    def reload(self) -> bool:
+        """
+        Build the guide again and swap it in if its prices changed
+
+        A failed build is logged and the current guide is kept, so a half
+        written price file never takes prices away.
+        """
+        with self.build_lock:
+            # Recorded even when the build fails, the files are retried
+            # once they change again
+            self.fingerprint = self.read_fingerprint()
+            try:
+                guide = self.build()
+            except PriceGuideException as e:
+                logger.error(f"Keeping price guide {self.current.version}: {e}")
+                return False
+            if guide.version == self.current.version:
+                return False
+            logger.info(f"Price guide {self.current.version} -> {guide.version}")
+            self.current = guide
+        for listener in self.listeners:
+            listener(guide)
+        return True
+
+    def start(self) -> None:
+        """Poll the directory from a background thread"""
+        if self.thread is not None:
+            return
+        self.stopped.clear()
+        self.thread = Thread(target=self.run, name="price-guide-reloader", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.stopped.set()
+        self.thread.join()
+        self.thread = None
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Price guide reload failed")
@@ -0,0 +1,59 @@
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+import os
+import pickle
+import tempfile
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Bump whenever the compiled price structures change shape
+SNAPSHOT_FORMAT = 1
+
+
+def write_snapshot(path: Path, checksum: str, state: Dict[str, Any]) -> None:
+    """
+    Write a compiled price guide snapshot
+
+    The snapshot is written to a temporary file and renamed into place, so
+    readers never see a partial snapshot.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {"format": SNAPSHOT_FORMAT, "checksum": checksum, "state": state}
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+    logger.info(f"Wrote price guide snapshot {path}")
+
+
+def read_snapshot(path: Path, checksum: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a compiled price guide snapshot
+
+    Returns None when the snapshot is missing, unreadable, from another
+    format or compiled from other source files than checksum.
+    """
+    try:
+        with open(path, "rb") as f:
+            payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        # Snapshots of older builds may name classes or modules that are gone
+        logger.warning(f"Ignoring unreadable price guide snapshot {path}: {e}")
+        return None
+
+    if not isinstance(payload, dict) or payload.get("format") != SNAPSHOT_FORMAT:
+        logger.info(f"Price guide snapshot {path} has an old format")
+        return None
+    if payload.get("checksum") != checksum:
+        logger.info(f"Price guide snapshot {path} is stale")
+        return None
+    return payload["state"]
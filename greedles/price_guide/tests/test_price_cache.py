@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from greedles.price_guide.price_cache import MISSING, PriceCache
+from greedles.price_guide.price_guide import BasePriceStrategy, PriceGuideFixed
+
+PRICE_DATA_DIR = Path("resources/data/price_guide")
+
+
+def test_price_cache_lru():
+    cache = PriceCache(maxsize=2)
+    cache.put("a", 1.0)
+    cache.put("b", 0.0)
+    assert cache.get("a") == 1.0
+    cache.put("c", 3.0)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1.0
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memoized_prices():
+    guide = PriceGuideFixed(PRICE_DATA_DIR)
+    guide.price_cache.clear()
+
+    first = guide.get_price_weapon("EXCALIBUR", {"N": 60}, 35, 0, "")
+    # Names are normalized and item_data is not part of the key
+    second = guide.get_price_weapon("excalibur", {"N": 60}, 35, 0, "", {"x": 1})
+    assert first == second
+
+    stats = guide.price_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+    assert stats["miss_latency_us"] > 0
+
+    # Every strategy is cached at once
+    maximum = guide.get_price_weapon(
+        "EXCALIBUR", {"N": 60}, 35, 0, "", strategy=BasePriceStrategy.MAXIMUM
+    )
+    assert maximum > first
+    assert guide.price_cache.stats()["hits"] == 2
+
+
+def test_memoized_prices_dropped_on_rebuild():
+    guide = PriceGuideFixed(PRICE_DATA_DIR)
+    guide.get_price_unit("Adept")
+    assert guide.price_cache.stats()["size"] > 0
+
+    guide.compile_prices()
+
+    assert guide.price_cache.stats()["size"] == 0
@@ -15,7 +15,11 @@ import pytest
 from pathlib import Path
 import logging
 
-from greedles.price_guide.price_guide import PriceGuideFixed, BasePriceStrategy
+from greedles.price_guide.price_guide import (
+    PriceGuideFixed,
+    BasePriceStrategy,
+    PriceGuideParseException,
+)
 
 PRICE_DATA_DIR = Path("resources/data/price_guide")
 
@@ -76,16 +80,22 @@ def test_weapon_hit_adjustments(fixed_price_guide: PriceGuideFixed):
 def test_pricing_strategies(fixed_price_guide: PriceGuideFixed):
     """Test different base price strategies"""
     # Test MINIMUM strategy
-    fixed_price_guide.bps = BasePriceStrategy.MINIMUM
-    assert fixed_price_guide.get_price_weapon("EXCALIBUR", {}, 0, 0, "") == 9
+    price = fixed_price_guide.get_price_weapon(
+        "EXCALIBUR", {}, 0, 0, "", strategy=BasePriceStrategy.MINIMUM
+    )
+    assert price == 9
 
     # Test MAXIMUM strategy
-    fixed_price_guide.bps = BasePriceStrategy.MAXIMUM
-    assert fixed_price_guide.get_price_weapon("EXCALIBUR", {}, 0, 0, "") == 12
+    price = fixed_price_guide.get_price_weapon(
+        "EXCALIBUR", {}, 0, 0, "", strategy=BasePriceStrategy.MAXIMUM
+    )
+    assert price == 12
 
     # Test AVERAGE strategy
-    fixed_price_guide.bps = BasePriceStrategy.AVERAGE
-    assert fixed_price_guide.get_price_weapon("EXCALIBUR", {}, 0, 0, "") == 10.5
+    price = fixed_price_guide.get_price_weapon(
+        "EXCALIBUR", {}, 0, 0, "", strategy=BasePriceStrategy.AVERAGE
+    )
+    assert price == 10.5
 
 
 def test_special_weapons(fixed_price_guide: PriceGuideFixed):
@@ -156,3 +166,47 @@ def test_price_guide_units(fixed_price_guide: PriceGuideFixed):
     """Test units with simple base prices"""
     assert fixed_price_guide.get_price_unit("Adept") == 38
     assert fixed_price_guide.get_price_unit("Centurion/Ability") == 7
+
+
+def test_name_index(fixed_price_guide: PriceGuideFixed):
+    """Test lookups ignore case in every category"""
+    assert fixed_price_guide.key_conflicts == []
+    assert fixed_price_guide.find_key("weapons", "excalibur") == "EXCALIBUR"
+    assert fixed_price_guide.find_key("srank_modifiers", "berserk") == "BERSERK"
+    assert fixed_price_guide.find_key("units", "no such unit") is None
+    assert fixed_price_guide.get_price_unit(
+        "adept"
+    ) == fixed_price_guide.get_price_unit("Adept")
+
+
+def test_name_index_conflicts(tmp_path: Path):
+    """Test duplicate and case-colliding names are reported at load"""
+    for path in PRICE_DATA_DIR.glob("*.json"):
+        (tmp_path / path.name).write_bytes(path.read_bytes())
+    (tmp_path / "units.json").write_text(
+        '{"Adept": {"base": "1"}, "ADEPT": {"base": "2"}, "Adept": {"base": "3"}}'
+    )
+
+    guide = PriceGuideFixed(tmp_path)
+
+    assert len(guide.key_conflicts) == 2
+    assert guide.get_price_unit("adept") == 3
+
+
+def test_weapon_attribute_modifiers(fixed_price_guide: PriceGuideFixed):
+    """Test high attributes add the weapon's modifier price"""
+    base = fixed_price_guide.get_price_weapon("EXCALIBUR", {}, 0, 0, "")
+    price = fixed_price_guide.get_price_weapon(
+        "EXCALIBUR", {"N": 60, "H": 60}, 0, 0, ""
+    )
+    assert price > base
+
+
+def test_malformed_prices_rejected_at_load(tmp_path: Path):
+    """Test a price that cannot be parsed fails the load, not the lookup"""
+    for path in PRICE_DATA_DIR.glob("*.json"):
+        (tmp_path / path.name).write_bytes(path.read_bytes())
+    (tmp_path / "units.json").write_text('{"Adept": {"base": "cheap"}}')
+
+    with pytest.raises(PriceGuideParseException):
+        PriceGuideFixed(tmp_path)
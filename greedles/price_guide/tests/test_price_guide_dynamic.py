@@ -0,0 +1,152 @@
+"""
+Test PriceGuideDynamic against a local stub of the price API
+
+The stub serves the shipped price guide files with ETags and can be told
+to fail, to exercise revalidation, the disk cache and the fallbacks.
+"""
+
+import asyncio
+import hashlib
+from pathlib import Path
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from greedles.price_guide.price_guide import PriceGuideDynamic, PriceGuideException
+
+PRICE_DATA_DIR = Path("resources/data/price_guide")
+
+
+class StubPriceApi:
+    def __init__(self):
+        self.files = {
+            path.name: path.read_bytes() for path in PRICE_DATA_DIR.glob("*.json")
+        }
+        self.requests = []
+        self.available = True
+
+    async def handle(self, request: web.Request) -> web.Response:
+        filename = request.match_info["filename"]
+        self.requests.append((filename, request.headers.get("If-None-Match")))
+        if not self.available:
+            return web.Response(status=503)
+        body = self.files[filename]
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(body=body, headers={"ETag": etag})
+
+    def revalidated(self):
+        return [etag is not None for _, etag in self.requests]
+
+
+async def serve(api: StubPriceApi) -> TestServer:
+    app = web.Application()
+    app.router.add_get("/prices/{filename}", api.handle)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+def run_with_stub(api: StubPriceApi, scenario):
+    async def main():
+        server = await serve(api)
+        try:
+            return await scenario(str(server.make_url("/prices")))
+        finally:
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def test_fetch_and_revalidate(tmp_path: Path):
+    api = StubPriceApi()
+
+    async def scenario(url):
+        guide = await PriceGuideDynamic.create(url, cache_directory=tmp_path)
+        version = guide.version
+        await guide.build_prices()
+        await guide.close()
+        return guide, version
+
+    guide, version = run_with_stub(api, scenario)
+
+    assert guide.get_price_unit("Adept") == 38
+    assert guide.version == version
+    # Every category was fetched once, then revalidated with its ETag
+    assert len(api.requests) == 2 * len(PriceGuideDynamic.PRICE_FILES)
+    assert api.revalidated().count(True) == len(PriceGuideDynamic.PRICE_FILES)
+
+
+def test_restart_uses_disk_cache(tmp_path: Path):
+    api = StubPriceApi()
+
+    async def scenario(url):
+        first = await PriceGuideDynamic.create(url, cache_directory=tmp_path)
+        await first.close()
+        api.requests.clear()
+        second = await PriceGuideDynamic.create(url, cache_directory=tmp_path)
+        await second.close()
+        return second
+
+    guide = run_with_stub(api, scenario)
+
+    assert all(api.revalidated())
+    assert guide.get_price_unit("Adept") == 38
+
+
+def test_unavailable_source_falls_back(tmp_path: Path):
+    api = StubPriceApi()
+
+    async def scenario(url):
+        first = await PriceGuideDynamic.create(url, cache_directory=tmp_path)
+        await first.close()
+
+        api.available = False
+        # A running guide keeps its prices
+        await first.build_prices()
+        await first.close()
+        # A restarted guide loads the last good responses from disk
+        second = await PriceGuideDynamic.create(url, cache_directory=tmp_path)
+        await second.close()
+        return first, second
+
+    first, second = run_with_stub(api, scenario)
+
+    assert first.get_price_unit("Adept") == 38
+    assert second.version == first.version
+
+
+def test_unavailable_source_without_cache():
+    api = StubPriceApi()
+    api.available = False
+
+    async def scenario(url):
+        guide = PriceGuideDynamic(url)
+        try:
+            await guide.build_prices()
+        finally:
+            await guide.close()
+
+    with pytest.raises(PriceGuideException):
+        run_with_stub(api, scenario)
+
+
+def test_invalid_update_keeps_prices(tmp_path: Path):
+    api = StubPriceApi()
+
+    async def scenario(url):
+        guide = await PriceGuideDynamic.create(url, cache_directory=tmp_path)
+        api.files["units.json"] = b'{"Adept": '
+        await guide.build_prices()
+        await guide.close()
+        return guide
+
+    guide = run_with_stub(api, scenario)
+
+    assert guide.get_price_unit("Adept") == 38
+    assert b"38" in (tmp_path / "units.json").read_bytes()
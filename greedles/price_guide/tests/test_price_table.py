@@ -0,0 +1,37 @@
+import pytest
+
+from greedles.price_guide.price_table import (
+    PriceTableException,
+    ThresholdTable,
+    WeaponPrice,
+    parse_price_range,
+)
+
+
+def test_parse_price_range():
+    assert parse_price_range("9-12") == (9, 10.5, 12)
+    assert parse_price_range("4800") == (4800, 4800, 4800)
+    assert parse_price_range(".5") == (0.5, 0.5, 0.5)
+    assert parse_price_range("30+") == (30, 30, 30)
+    assert parse_price_range("N/A") == (0, 0, 0)
+    assert parse_price_range("-") == (0, 0, 0)
+    with pytest.raises(PriceTableException):
+        parse_price_range("lots")
+
+
+def test_threshold_table():
+    table = ThresholdTable({"30": "50-100", "0": "1", "15": "N/A"})
+    assert table.thresholds == [0, 15, 30]
+    assert table.find(-1) is None
+    assert table.find(14) == (1, 1, 1)
+    assert table.find(15) == (0, 0, 0)
+    assert table.find(99) == (50, 75, 100)
+
+
+def test_weapon_price():
+    weapon = WeaponPrice({"base": "9-12", "modifiers": {"N": "30+"}})
+    assert weapon.base == (9, 10.5, 12)
+    assert weapon.modifiers["N"] == (30, 30, 30)
+    assert not weapon.hit_values
+    with pytest.raises(ValueError):
+        WeaponPrice({"base": "9-12", "hit_values": {"high": "5"}})
@@ -0,0 +1,65 @@
+"""
+Test reloading the price guide when its files change
+
+A copy of the shipped price files is edited under a PriceGuideReloader, which
+must swap in changed prices and keep the current guide when a build fails.
+"""
+
+import os
+from pathlib import Path
+
+from greedles.price_guide.reloader import PriceGuideReloader
+
+
+def touch(path: Path, content: str) -> None:
+    """Rewrite a file and move its mtime forward so polling sees it"""
+    mtime = path.stat().st_mtime_ns
+    path.write_text(content)
+    os.utime(path, ns=(mtime + 10**9, mtime + 10**9))
+
+
+def test_poll_swaps_changed_prices(price_directory: Path):
+    reloader = PriceGuideReloader(price_directory)
+    swapped = []
+    reloader.listeners.append(swapped.append)
+    in_flight = reloader.current
+
+    assert not reloader.poll()
+
+    touch(price_directory / "units.json", '{"Adept": {"base": "1"}}')
+    assert reloader.poll()
+
+    assert reloader.current.get_price_unit("Adept") == 1
+    assert swapped == [reloader.current]
+    # Requests that took the old guide keep pricing against it
+    assert in_flight.get_price_unit("Adept") == 38
+
+
+def test_failed_reload_keeps_guide(price_directory: Path):
+    reloader = PriceGuideReloader(price_directory)
+    guide = reloader.current
+
+    touch(price_directory / "units.json", '{"Adept": ')
+
+    assert not reloader.poll()
+    assert reloader.current is guide
+
+    # The fixed file is picked up by the next poll
+    touch(price_directory / "units.json", '{"Adept": {"base": "3"}}')
+    assert reloader.poll()
+    assert reloader.current.get_price_unit("Adept") == 3
+
+
+def test_background_polling(price_directory: Path):
+    reloader = PriceGuideReloader(price_directory, interval=0.01)
+    reloader.start()
+    try:
+        touch(price_directory / "units.json", '{"Adept": {"base": "2"}}')
+        for _ in range(500):
+            if reloader.current.get_price_unit("Adept") == 2:
+                break
+            reloader.stopped.wait(0.01)
+    finally:
+        reloader.stop()
+
+    assert reloader.current.get_price_unit("Adept") == 2
@@ -0,0 +1,61 @@
+"""
+Test the compiled price guide snapshot
+
+Guides are built from a copy of the shipped price files and checked to load a
+fresh snapshot, and to rebuild and rewrite a stale or unreadable one.
+"""
+
+from pathlib import Path
+
+from greedles.price_guide.price_guide import PriceGuideFixed
+
+
+def test_snapshot_round_trip(price_directory: Path, monkeypatch):
+    snapshot = price_directory.parent / "prices.snapshot"
+    built = PriceGuideFixed(price_directory, snapshot)
+    assert snapshot.exists()
+
+    # A fresh snapshot is loaded without parsing any JSON
+    def fail(*args):
+        raise AssertionError("JSON parsed despite a fresh snapshot")
+
+    monkeypatch.setattr(PriceGuideFixed, "_parse_json_file", fail)
+    loaded = PriceGuideFixed(price_directory, snapshot)
+
+    assert loaded.version == built.version
+    assert loaded.get_price_weapon("EXCALIBUR", {}, 35, 0, "") == (
+        built.get_price_weapon("EXCALIBUR", {}, 35, 0, "")
+    )
+
+
+def test_stale_snapshot_rebuilt(price_directory: Path):
+    snapshot = price_directory.parent / "prices.snapshot"
+    built = PriceGuideFixed(price_directory, snapshot)
+
+    (price_directory / "units.json").write_text('{"Adept": {"base": "1"}}')
+    rebuilt = PriceGuideFixed(price_directory, snapshot)
+
+    assert rebuilt.version != built.version
+    assert rebuilt.get_price_unit("Adept") == 1
+
+
+def test_corrupt_snapshot_ignored(price_directory: Path):
+    snapshot = price_directory.parent / "prices.snapshot"
+    snapshot.write_bytes(b"not a snapshot")
+
+    guide = PriceGuideFixed(price_directory, snapshot)
+
+    assert guide.get_price_unit("Adept") == 38
+
+
+def test_snapshot_of_removed_module_ignored(price_directory: Path):
+    snapshot = price_directory.parent / "prices.snapshot"
+    # A pickled global of a module an older build had
+    stale = b"cgreedles.removed_module\nPrices\n."
+    snapshot.write_bytes(stale)
+
+    guide = PriceGuideFixed(price_directory, snapshot)
+
+    assert guide.get_price_unit("Adept") == 38
+    # The snapshot is written again
+    assert snapshot.read_bytes() != stale
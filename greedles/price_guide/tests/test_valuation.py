@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from greedles.model.inventory import Inventory
+from greedles.price_guide.price_guide import BasePriceStrategy, PriceGuideFixed
+from greedles.price_guide.valuation import ItemColumns, ValuationEngine
+
+PRICE_DATA_DIR = Path("resources/data/price_guide")
+
+
+def weapon(name, hit, native=0):
+    attribute = {"native": native, "a_beast": 0, "machine": 0, "dark": 0, "hit": hit}
+    return {"type": 1, "price_name": name, "attribute": attribute}
+
+
+ENTRIES = [
+    ["00AC00", weapon("EXCALIBUR", 35, native=60), "Slot1"],
+    ["00AC00", weapon("EXCALIBUR", 0), "Slot1"],
+    ["000000", weapon("SNOW QUEEN", 15), "Slot1"],
+    ["010100", {"type": 2, "price_name": "Brightness Circle", "slot": 4}, "Slot1"],
+    ["010300", {"type": 4, "price_name": "Adept"}, "Slot2"],
+    ["03020E", {"type": 6, "price_name": "Foie", "level": 30}, "Slot2"],
+    ["030000", {"type": 7, "price_name": "Photon Crystal", "number": 3}, "Slot2"],
+    ["030000", {"type": 7, "price_name": "No Such Tool", "number": 3}, "Slot2"],
+    ["008B00", {"type": 8, "price_name": "ES BLADE"}, "Slot2"],
+    ["MESETA", {"type": 10, "value": 1000000}, "Slot2"],
+]
+
+
+def expected_price(guide, item, strategy):
+    """Price of an item through the scalar get_price_* methods"""
+    name = item.get("price_name")
+    if item["type"] == 1:
+        attribute = item["attribute"]
+        attributes = {"N": attribute["native"], "AB": 0, "M": 0, "D": 0}
+        return guide.get_price_weapon(
+            name, attributes, attribute["hit"], 0, "", strategy=strategy
+        )
+    if item["type"] == 2:
+        return guide.get_price_frame(name, {}, {}, item["slot"], strategy=strategy)
+    if item["type"] == 4:
+        return guide.get_price_unit(name, strategy=strategy)
+    if item["type"] == 6:
+        return guide.get_price_disk(name, item["level"], strategy=strategy)
+    if item["type"] == 7:
+        return guide.get_price_tool(name, item["number"], strategy=strategy)
+    if item["type"] == 8:
+        return guide.get_price_srank_weapon(name, "", 0, "", strategy=strategy)
+    return item["value"] / 500000
+
+
+def test_valuation_matches_scalar_pricing():
+    guide = PriceGuideFixed(PRICE_DATA_DIR)
+    engine = ValuationEngine(guide)
+
+    prices = engine.value_items(ENTRIES).prices
+
+    for strategy in (
+        BasePriceStrategy.MINIMUM,
+        BasePriceStrategy.AVERAGE,
+        BasePriceStrategy.MAXIMUM,
+    ):
+        expected = [expected_price(guide, entry[1], strategy) for entry in ENTRIES]
+        assert prices[:, strategy].tolist() == pytest.approx(expected)
+
+
+def test_valuation_subtotals():
+    engine = ValuationEngine(PriceGuideFixed(PRICE_DATA_DIR))
+    slot1 = ItemColumns.from_items(engine, ENTRIES[:4])
+    slot2 = ItemColumns.from_items(engine, ENTRIES[4:])
+
+    valuation = engine.value(ItemColumns.concatenate([slot1, slot2]))
+
+    assert set(valuation.by_group) == {"Slot1", "Slot2"}
+    assert valuation.by_group["Slot1"] + valuation.by_group["Slot2"] == pytest.approx(
+        valuation.total
+    )
+    assert valuation.by_type[10][0] == 2
+    # Meseta is left out of the totals, as in Inventory.prices
+    items = sum(valuation.by_type.values()) - valuation.by_type[10]
+    assert items == pytest.approx(valuation.total)
+    assert valuation.total[0] <= valuation.total[1] <= valuation.total[2]
+
+
+def test_valuation_total_matches_inventory():
+    guide = PriceGuideFixed(PRICE_DATA_DIR)
+    engine = ValuationEngine(guide)
+    valuation = engine.value_items(ENTRIES)
+
+    entries = [
+        [code, dict(item, prices=tuple(prices)), slot]
+        for (code, item, slot), prices in zip(ENTRIES, valuation.prices)
+        if item["type"] != 10
+    ]
+    entries.append(ENTRIES[-1])
+    inventory = Inventory(entries, 1, 1000000)
+
+    assert inventory.prices() == pytest.approx(tuple(valuation.total))
@@ -0,0 +1,308 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Sequence
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+from greedles.model.config.config import Config
+from greedles.price_guide.price_guide import (
+    HIGH_ATTRIBUTE_THRESHOLD,
+    MESESTA_PER_PD,
+    PriceGuideAbstract,
+)
+from greedles.price_guide.price_table import ThresholdTable, ZERO_PRICE
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Item type -> price guide category
+TYPE_CATEGORIES: Dict[int, str] = {
+    Config.ItemType.WEAPON: "weapons",
+    Config.ItemType.FRAME: "frames",
+    Config.ItemType.BARRIER: "barriers",
+    Config.ItemType.UNIT: "units",
+    Config.ItemType.MAG: "mags",
+    Config.ItemType.DISK: "disks",
+    Config.ItemType.TOOL: "tools",
+    Config.ItemType.SRANK_WEAPON: "srank_weapons",
+}
+
+# Weapon attribute columns, in the order of ItemColumns.attributes
+ATTRIBUTES = ("N", "AB", "M", "D")
+
+# Row of the meseta pseudo price entry
+MESETA_ROW = 0
+
+
+class ItemColumns:
+    """
+    Columnar item data for ValuationEngine
+
+    One row per item: its type, its name id from ValuationEngine.name_id
+    (-1 when the guide has no price), the hit percentage for weapons or level
+    for disks, the native/a_beast/machine/dark attributes, the stack count,
+    the slots of frames and a group id indexing labels.
+    """
+
+    def __init__(
+        self,
+        item_type: "np.ndarray",
+        name_id: "np.ndarray",
+        hit: "np.ndarray",
+        attributes: "np.ndarray",
+        count: "np.ndarray",
+        slots: "np.ndarray",
+        group: "np.ndarray",
+        labels: Sequence[Hashable],
+    ):
+        self.item_type = item_type
+        self.name_id = name_id
+        self.hit = hit
+        self.attributes = attributes
+        self.count = count
+        self.slots = slots
+        self.group = group
+        self.labels = list(labels)
+
+    def __len__(self) -> int:
+        return len(self.item_type)
+
+    @classmethod
+    def from_items(
+        cls,
+        engine: "ValuationEngine",
+        entries: Iterable[List[Any]],
+        group: Callable[[List[Any]], Hashable] = lambda entry: entry[2],
+    ) -> "ItemColumns":
+        """
+        Build columns from [code, item, slot, ...] inventory entries
+
+        Entries are grouped by their slot unless another group function is
+        given, e.g. lambda entry: entry[1]["type"].
+        """
+        rows = []
+        labels: Dict[Hashable, int] = {}
+        for entry in entries:
+            item = entry[1]
+            item_type = item["type"]
+            hit = 0
+            attributes = (0, 0, 0, 0)
+            count = 1
+            slots = 0
+            if item_type == Config.ItemType.MESETA:
+                name_id = MESETA_ROW
+                count = item["value"]
+            else:
+                name_id = engine.name_id(
+                    TYPE_CATEGORIES.get(item_type, ""), item.get("price_name", "")
+                )
+            if item_type == Config.ItemType.WEAPON:
+                attribute = item["attribute"]
+                hit = attribute["hit"]
+                attributes = (
+                    attribute["native"],
+                    attribute["a_beast"],
+                    attribute["machine"],
+                    attribute["dark"],
+                )
+            elif item_type == Config.ItemType.DISK:
+                hit = item["level"]
+            elif item_type == Config.ItemType.FRAME:
+                slots = item["slot"]
+            elif item_type == Config.ItemType.TOOL:
+                count = item["number"]
+            label = group(entry)
+            rows.append(
+                (item_type, name_id, hit, *attributes, count, slots)
+                + (labels.setdefault(label, len(labels)),)
+            )
+
+        table = np.array(rows, dtype=np.int64).reshape(-1, 10)
+        return cls(
+            table[:, 0],
+            table[:, 1],
+            table[:, 2],
+            table[:, 3:7],
+            table[:, 7],
+            table[:, 8],
+            table[:, 9],
+            list(labels),
+        )
+
+    @classmethod
+    def concatenate(cls, columns: Sequence["ItemColumns"]) -> "ItemColumns":
+        """Join columns, e.g. of many accounts, keeping their groups apart"""
+        groups = []
+        labels: List[Hashable] = []
+        for column in columns:
+            groups.append(column.group + len(labels))
+            labels.extend(column.labels)
+        return cls(
+            *(
+                np.concatenate([getattr(column, name) for column in columns])
+                for name in (
+                    "item_type",
+                    "name_id",
+                    "hit",
+                    "attributes",
+                    "count",
+                    "slots",
+                )
+            ),
+            np.concatenate(groups),
+            labels,
+        )
+
+
+class Valuation:
+    """
+    Prices of a set of items under every BasePriceStrategy
+
+    Every value is a (minimum, average, maximum) array. Like
+    Inventory.prices, total and by_group leave meseta out: its price is only
+    in prices and in by_type[Config.ItemType.MESETA].
+    """
+
+    def __init__(self, prices: "np.ndarray", columns: ItemColumns):
+        self.prices = prices
+        items = prices * (columns.item_type != Config.ItemType.MESETA)[:, np.newaxis]
+        self.total = items.sum(axis=0)
+
+        types, type_index = np.unique(columns.item_type, return_inverse=True)
+        by_type = self._sum_by(prices, type_index, len(types))
+        self.by_type: Dict[int, "np.ndarray"] = {
+            int(item_type): subtotal for item_type, subtotal in zip(types, by_type)
+        }
+
+        by_group = self._sum_by(items, columns.group, len(columns.labels))
+        self.by_group: Dict[Hashable, "np.ndarray"] = dict(
+            zip(columns.labels, by_group)
+        )
+
+    @staticmethod
+    def _sum_by(prices: "np.ndarray", index: "np.ndarray", size: int) -> "np.ndarray":
+        return np.stack(
+            [
+                np.bincount(index, weights=prices[:, strategy], minlength=size)
+                for strategy in range(3)
+            ],
+            axis=1,
+        )
+
+
+class ValuationEngine:
+    """
+    Vectorized valuation of many items against a price guide
+
+    The guide's compiled prices are laid out once as arrays indexed by name id,
+    so pricing any number of items is a handful of NumPy gathers. The engine
+    is a snapshot: build a new one when the guide's version changes.
+    """
+
+    def __init__(self, price_guide: PriceGuideAbstract):
+        if np is None:
+            raise ImportError("ValuationEngine requires numpy")
+        self.version = price_guide.version
+
+        # Row 0 prices meseta, per meseta
+        meseta = 1 / MESESTA_PER_PD
+        bases = [(meseta, meseta, meseta)]
+        modifiers = [[ZERO_PRICE] * len(ATTRIBUTES)]
+        thresholds: List[ThresholdTable] = [ThresholdTable({})]
+        # Weapons only price hit when it is above 0, disks always price level
+        always_thresholded = [False]
+        self.rows: Dict[str, Dict[str, int]] = {}
+
+        for category in TYPE_CATEGORIES.values():
+            category_rows = self.rows.setdefault(category, {})
+            for name, entry in price_guide.compiled.get(category, {}).items():
+                category_rows[name] = len(bases)
+                if category == "weapons":
+                    bases.append(entry.base)
+                    modifiers.append(
+                        [
+                            entry.modifiers.get(attribute, ZERO_PRICE)
+                            for attribute in ATTRIBUTES
+                        ]
+                    )
+                    thresholds.append(entry.hit_values)
+                elif category == "disks":
+                    bases.append(ZERO_PRICE)
+                    modifiers.append([ZERO_PRICE] * len(ATTRIBUTES))
+                    thresholds.append(entry)
+                else:
+                    bases.append(entry)
+                    modifiers.append([ZERO_PRICE] * len(ATTRIBUTES))
+                    thresholds.append(ThresholdTable({}))
+                always_thresholded.append(category == "disks")
+
+        self.base = np.array(bases, dtype=np.float64)
+        self.modifiers = np.array(modifiers, dtype=np.float64)
+        self.always_thresholded = np.array(always_thresholded, dtype=bool)
+
+        # Threshold lists padded to one width; padding never matches a value
+        width = max(len(table.thresholds) for table in thresholds) or 1
+        self.thresholds = np.full(
+            (len(thresholds), width), np.iinfo(np.int64).max, dtype=np.int64
+        )
+        self.threshold_prices = np.zeros((len(thresholds), width, 3))
+        for row, table in enumerate(thresholds):
+            self.thresholds[row, : len(table.thresholds)] = table.thresholds
+            if table.prices:
+                self.threshold_prices[row, : len(table.prices)] = table.prices
+
+        self.frame_rows = np.zeros(len(bases), dtype=bool)
+        self.frame_rows[list(self.rows["frames"].values())] = True
+        add_slot = price_guide.find_key("tools", "AddSlot")
+        self.add_slot = np.array(
+            price_guide.compiled["tools"][add_slot] if add_slot else ZERO_PRICE
+        )
+
+        self.price_guide = price_guide
+
+    def name_id(self, category: str, name: str) -> int:
+        """Row of a priced item, -1 if the guide has no price for it"""
+        key = self.price_guide.find_key(category, name)
+        if key is None:
+            return -1
+        return self.rows.get(category, {}).get(key, -1)
+
+    def prices(self, columns: ItemColumns) -> "np.ndarray":
+        """(minimum, average, maximum) price of every item"""
+        known = columns.name_id >= 0
+        rows = np.where(known, columns.name_id, MESETA_ROW)
+
+        prices = self.base[rows].copy()
+
+        # Attribute modifiers of weapons
+        high = columns.attributes > HIGH_ATTRIBUTE_THRESHOLD
+        prices += (self.modifiers[rows] * high[:, :, np.newaxis]).sum(axis=1)
+
+        # Hit and level thresholds, the largest threshold <= value
+        hit = columns.hit[:, np.newaxis]
+        index = (self.thresholds[rows] <= hit).sum(axis=1) - 1
+        applies = (index >= 0) & ((columns.hit > 0) | self.always_thresholded[rows])
+        threshold_prices = self.threshold_prices[rows, np.maximum(index, 0)]
+        prices += np.where(applies[:, np.newaxis], threshold_prices, 0)
+
+        # Added slots of frames
+        slots = np.where(self.frame_rows[rows], columns.slots, 0)
+        prices += slots[:, np.newaxis] * self.add_slot
+
+        prices *= columns.count[:, np.newaxis]
+        prices[~known] = 0
+        return prices
+
+    def value(self, columns: ItemColumns) -> Valuation:
+        """Price every item and total them, by type and by group"""
+        return Valuation(self.prices(columns), columns)
+
+    def value_items(
+        self,
+        entries: Iterable[List[Any]],
+        group: Callable[[List[Any]], Hashable] = lambda entry: entry[2],
+    ) -> Valuation:
+        """Value [code, item, slot, ...] inventory entries, e.g. of all_items"""
+        return self.value(ItemColumns.from_items(self, entries, group))
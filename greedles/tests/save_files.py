@@ -0,0 +1,17 @@
+"""
+Synthetic save files shared by the tests
+
+MONOMATE is the raw record of a stack of five Monomates, the character and
+share bank files hold it as their only item.
+"""
+
+MONOMATE = bytes([0x03, 0x00, 0x00, 0x00, 0x00, 0x05]).ljust(28, b"\x00")
+SHARE_BANK = MONOMATE.ljust(4800, b"\x00")
+
+
+def character_file(name: str) -> bytes:
+    data = bytearray(11520)
+    data[4] = 1
+    data[8:36] = MONOMATE
+    data[968 : 968 + 2 * len(name)] = name.encode("utf-16-le")
+    return bytes(data)
@@ -0,0 +1,88 @@
+"""
+Test the Flask uploader
+
+Uploads are built in memory from synthetic character and share bank files.
+"""
+
+import io
+import json
+import os
+import zipfile
+from importlib import import_module
+from tempfile import SpooledTemporaryFile
+
+import pytest
+
+pytest.importorskip("flask")
+
+from app import app
+from greedles.tests.save_files import SHARE_BANK, character_file
+
+
+def archive_file(members) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for name, data in members.items():
+            zip_file.writestr(name, data)
+    return buffer.getvalue()
+
+
+def upload(client, data: bytes, filename: str = "Ephinea.zip"):
+    return client.post(
+        "/upload",
+        data={"file": (io.BytesIO(data), filename)},
+        content_type="multipart/form-data",
+    )
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def test_upload(client):
+    data = archive_file(
+        {
+            ".psobank": SHARE_BANK,
+            "0.psochar": character_file("First"),
+        }
+    )
+
+    response = upload(client, data)
+
+    assert response.status_code == 200
+    result = json.loads(response.data)
+    assert [character["name"] for character in result["psoChars"]] == ["First"]
+    assert result["psobank"]["inventory"]["inventory"][0][1]["name"] == "Monomate"
+
+
+def test_upload_spills_to_disk(client, monkeypatch):
+    files = []
+
+    class RecordedFile(SpooledTemporaryFile):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            files.append(self)
+
+    monkeypatch.setattr(import_module("app"), "SpooledTemporaryFile", RecordedFile)
+    monkeypatch.setitem(app.config, "UPLOAD_SPILL_THRESHOLD", 1024)
+    small = archive_file({".psobank": SHARE_BANK})
+    # Random bytes do not compress, the archive outgrows the threshold
+    large = archive_file({".psobank": SHARE_BANK, "notes.txt": os.urandom(4096)})
+
+    assert upload(client, small).status_code == 200
+    assert upload(client, large).status_code == 200
+
+    assert [file._max_size for file in files] == [1024, 1024]
+    assert [file._rolled for file in files] == [False, True]
+
+
+def test_upload_without_share_bank(client):
+    response = upload(client, archive_file({"0.psochar": character_file("First")}))
+
+    assert response.status_code == 400
+    assert "psobank" in json.loads(response.data)["error"]
+
+
+def test_upload_not_zip(client):
+    assert upload(client, b"data", "Ephinea.txt").status_code == 400
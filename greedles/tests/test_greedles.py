@@ -0,0 +1,161 @@
+"""
+Test the Greedles FastAPI application
+
+Uploads are built in memory from synthetic character and share bank files.
+"""
+
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi.testclient import TestClient
+
+from greedles import greedles_app
+from greedles.greedles_app import app
+from greedles.tests.save_files import SHARE_BANK, character_file
+
+
+def archive_file() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr("Ephinea/0.psochar", character_file("First"))
+        zip_file.writestr("Ephinea/.psobank", SHARE_BANK)
+    return buffer.getvalue()
+
+
+@pytest.fixture(params=[1, 0], ids=["process", "thread"])
+def client(request, monkeypatch, tmp_path):
+    monkeypatch.setattr(greedles_app, "PARSE_WORKERS", request.param)
+    monkeypatch.setattr(greedles_app, "RESULT_CACHE_DIRECTORY", tmp_path / "results")
+    # Entering the client runs the app's lifespan startup
+    with TestClient(app) as client:
+        yield client
+
+
+def test_health(client: TestClient):
+    assert client.get("/health").json() == {"status": "healthy"}
+
+
+def test_parse_archive(client: TestClient):
+    response = client.post(
+        "/parse", files=[("files", ("Ephinea.zip", archive_file(), "application/zip"))]
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert [character["name"] for character in result["characters"]] == ["First"]
+    assert len(result["share_banks"]) == 1
+    assert len(result["all_items"]) == 2
+
+
+def test_parse_character_name_without_slot(client: TestClient):
+    files = [("files", ("mychar.psochar", character_file("First")))]
+
+    response = client.post("/parse", files=files)
+
+    assert response.status_code == 200
+    [character] = response.json()["characters"]
+    assert (character["name"], character["slot"]) == ("First", 1)
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_shared_result_cache(monkeypatch):
+    monkeypatch.setattr(greedles_app, "PARSE_WORKERS", 1)
+    monkeypatch.setattr(greedles_app, "RESULT_CACHE_DIRECTORY", None)
+
+    with TestClient(app):
+        # The pool shares a private disk tier with the server by default
+        directory = app.state.result_cache.directory
+        assert directory.stat().st_mode & 0o777 == 0o700
+
+    assert not directory.exists()
+
+
+def test_startup_state(client):
+    parsers = app.state.parsers
+    assert parsers.config is app.state.config
+    assert parsers.price_guide is app.state.price_guide_reloader.current
+
+    client.post("/parse", files=[("files", ("upload.zip", archive_file()))])
+
+    # Requests reuse the parsers built at startup
+    assert app.state.parsers is parsers
+
+
+def test_parse_pool(client: TestClient):
+    pool = app.state.parse_pool
+    assert (pool is None) == (greedles_app.PARSE_WORKERS == 0)
+    if pool is not None:
+        assert len(pool._processes) == greedles_app.PARSE_WORKERS
+
+
+def test_parse_stream(client: TestClient):
+    response = client.post(
+        "/parse?stream=true",
+        files=[("files", ("Ephinea.zip", archive_file(), "application/zip"))],
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["type"] for record in records] == [
+        "character",
+        "share_bank",
+        "result",
+    ]
+    assert records[0]["character"]["name"] == "First"
+    assert records[2]["characters"] == 1
+    assert len(records[2]["all_items"]) == 2
+
+
+def test_parse_cached(client: TestClient):
+    files = [("files", ("Ephinea.zip", archive_file(), "application/zip"))]
+    first = client.post("/parse", files=files)
+    second = client.post("/parse", files=files)
+
+    assert second.content == first.content
+    assert app.state.result_cache.hits == 1
+
+
+def test_parse_batch(client: TestClient):
+    files = [
+        ("files", ("First.zip", archive_file(), "application/zip")),
+        ("files", ("Broken.zip", b"not a zip", "application/zip")),
+        ("files", ("Second.zip", archive_file(), "application/zip")),
+    ]
+
+    response = client.post("/parse/batch", files=files)
+
+    assert response.status_code == 200
+    result = response.json()
+    first, broken, second = result["accounts"]
+    assert (first["account"], first["status"]) == ("First.zip", "ok")
+    assert first["result"]["characters"][0]["name"] == "First"
+    # A failed account does not fail the batch
+    assert (broken["account"], broken["status"]) == ("Broken.zip", "error")
+    assert second["status"] == "ok"
+
+    items = result["all_items"][0]["Inventory"]["EN"]
+    first_items = first["result"]["all_items"][0]["Inventory"]["EN"]
+    assert len(items) == 2 * len(first_items)
+    assert {entry[3] for entry in items} == {"First.zip", "Second.zip"}
+    assert [entry[4] for entry in items] == list(range(len(items)))
+
+
+def test_parse_compact(client: TestClient):
+    files = [("files", ("Ephinea.zip", archive_file(), "application/zip"))]
+    full = client.post("/parse", files=files)
+    compact = client.post("/parse?compact=true", files=files)
+
+    assert len(compact.content) < len(full.content)
+    [[code, item, slot, index]] = compact.json()["characters"][0]["inventory"][
+        "inventory"
+    ][:1]
+    assert item["name"] == "Monomate"
+    assert "display" not in item and "itemdata" not in item